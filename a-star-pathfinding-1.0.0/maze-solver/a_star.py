@@ -1,75 +1,213 @@
-from queue import PriorityQueue
-from node_type import NodeType
+from heapq import heappush, heappop
+from node import Node
+from node_type import NodeType, EMPTY, VISITED
+from search_hooks import callbacks
 
 
 FAILURE = []
 
 
-def a_star(graph, start_node, end_node, draw=None, h=None):
-    if h is None:
-        def h(n):
-            return abs(end_node.row - n.row) + abs(end_node.col - n.col)
+def a_star(graph, start_node, end_node, draw=None, h=None, stats=None,
+           hooks=None):
+    """
+    Finds a shortest path from start_node to end_node and returns the Nodes in
+    between, or FAILURE if there is none.
+
+    The search runs on flat cell indices: the open list is a heapq of
+    (f, -g, counter, index) entries, so ties on f prefer the larger g, and
+    scores live in the Graph's SearchSpace arrays. Stale heap entries are
+    skipped with the closed stamps of the SearchSpace.
+
+    Entering a cell costs its value in the Graph's cost layer. The default
+    heuristic is the Manhattan distance times the smallest cost, which never
+    overestimates the remaining cost.
+
+    The work done is recorded in stats when a SearchStats is given, and the
+    events of the search are reported to hooks when a SearchHooks is given.
+    """
+
+    if stats is not None:
+        stats.begin()
 
-    if draw is None:
-        def draw():
-            return None
+    events = callbacks(hooks, draw)
+    on_expand, on_push, on_relax, on_path_node, on_done = events
+
+    cols = graph.collumns
+    end_row, end_col = end_node.row, end_node.col
+
+    # The default heuristic is computed inline on indices
+    scale = graph.get_min_cost()
+
+    if h is None:
+        heuristic = None
+    else:
+        def heuristic(index):
+            return h(Node(*divmod(index, cols), graph))
 
     graph.clear_path()
 
-    open_set = PriorityQueue()
+    start = start_node.row * cols + start_node.col
+    end = end_row * cols + end_col
+
+    # There are no cells in between when the start is the end, and cells the
+    # connectivity index separates have no path, there is nothing to search
+    if start == end or graph.is_separated(start, end):
+        if stats is not None:
+            stats.end_init()
+            stats.end(FAILURE)
+        if on_done is not None:
+            on_done(FAILURE)
+        return FAILURE
+
+    cells = graph._cells
+    touched = graph._touched
+    costs = graph.get_costs()
+    masks, steps = graph.get_neighbor_index()
+
+    space = graph.get_search_space()
+    generation = space.begin()
+    stamp = space.stamp
+    g_score = space.g_score
+    came_from = space.came_from
+    closed = space.closed
+
+    stamp[start] = generation
+    g_score[start] = 0
+
+    if heuristic is None:
+        start_f_score = scale * (abs(end_row - start_node.row)
+                                 + abs(end_col - start_node.col))
+    else:
+        start_f_score = heuristic(start)
+
+    open_set = [(start_f_score, 0, 0, start)]
+    counter = 1
+
+    if on_push is not None:
+        on_push(start_node.row, start_node.col, 0, start_f_score)
+
+    # Pushes are counted by counter already, and the expanded cells are the
+    # closed ones, only the peak of the open set needs watching
+    track = stats is not None
+    peak_open = 0
+
+    if track:
+        stats.end_init()
 
-    came_from = {}
+    while open_set:
+        if track and len(open_set) > peak_open:
+            peak_open = len(open_set)
 
-    g_score = {node: float("inf") for row in graph.get_grid() for node in row}
+        f_score, _, _, current = heappop(open_set)
 
-    f_score = {node: float("inf") for row in graph.get_grid() for node in row}
+        if closed[current] == generation:
+            continue
 
-    g_score[start_node] = 0
-    f_score[start_node] = h(start_node)
+        closed[current] = generation
 
-    open_set.put((f_score[start_node], start_node))
+        if cells[current] == EMPTY:
+            cells[current] = VISITED
+            touched.append(current)
 
-    while not open_set.empty():
-        # Since Queue.get() returns a pair of (priority, item)
-        _, current = open_set.get()
+        if on_expand is not None:
+            on_expand(*divmod(current, cols), g_score[current], f_score)
 
-        current.visits()
+        if current == end:
+            if track:
+                _end_search(stats, closed, generation, counter, open_set,
+                            peak_open)
 
-        draw()
+            nodes = resconstruct_path(graph, came_from, start, current,
+                                      on_path_node)
 
-        if current is end_node:
-            return resconstruct_path(came_from, start_node, current, draw)
+            if track:
+                stats.end(nodes)
 
-        for neighbor in graph.get_neighbors(current):
-            if neighbor.is_wall():
+            if on_done is not None:
+                on_done(nodes)
+
+            return nodes
+
+        current_g_score = g_score[current]
+
+        for step in steps[masks[current]]:
+            neighbor = current + step
+
+            if closed[neighbor] == generation:
                 continue
 
-            # since 1 is the weight between every node in the grid
-            tentative_g_score = g_score[current] + 1
+            tentative_g_score = current_g_score + costs[neighbor]
+
+            if stamp[neighbor] != generation:
+                stamp[neighbor] = generation
+            elif tentative_g_score >= g_score[neighbor]:
+                continue
+
+            came_from[neighbor] = current
+            g_score[neighbor] = tentative_g_score
+
+            if on_relax is not None:
+                on_relax(*divmod(neighbor, cols), tentative_g_score)
+
+            if heuristic is None:
+                row, col = divmod(neighbor, cols)
+                f_score = (tentative_g_score
+                           + scale * (abs(end_row - row) + abs(end_col - col)))
+            else:
+                f_score = tentative_g_score + heuristic(neighbor)
 
-            if tentative_g_score < g_score[neighbor]:
-                came_from[neighbor] = current
+            heappush(open_set,
+                     (f_score, -tentative_g_score, counter, neighbor))
+            counter += 1
 
-                g_score[neighbor] = tentative_g_score
-                f_score[neighbor] = g_score[neighbor] + h(neighbor)
+            if on_push is not None:
+                on_push(*divmod(neighbor, cols), tentative_g_score, f_score)
 
-                if not neighbor.is_visited():
-                    open_set.put((f_score[neighbor], neighbor))
+    if track:
+        _end_search(stats, closed, generation, counter, open_set, peak_open)
+        stats.end(FAILURE)
+
+    if on_done is not None:
+        on_done(FAILURE)
 
     return FAILURE
 
 
-def resconstruct_path(came_from, start, end, draw):
+def _end_search(stats, closed, generation, pushes, open_set, peak_open):
+    """Records the counters of a search in stats."""
+
+    expanded = closed.count(generation)
+    pops = pushes - len(open_set)
+
+    stats.end_search(expanded, pushes, pops, pops - expanded, peak_open)
+
+
+def resconstruct_path(graph, came_from, start, end, on_path_node=None):
+    """
+    Follows came_from back from the end index and marks the cells strictly
+    between start and end as path, returning them as Nodes in order and
+    passing their coordinates to on_path_node.
+    """
+
+    cols = graph.collumns
     current = came_from[end]
 
     total_path = []
 
-    while current is not start:
-        total_path.insert(0, current)
+    while current != start:
+        total_path.append(current)
         current = came_from[current]
 
-    for path in total_path:
-        path.update_type(NodeType.PATH)
-        draw()
+    total_path.reverse()
+
+    nodes = []
+
+    for index in total_path:
+        node = Node(*divmod(index, cols), graph)
+        node.update_type(NodeType.PATH)
+        nodes.append(node)
+
+        if on_path_node is not None:
+            on_path_node(node.row, node.col)
 
-    return total_path
+    return nodes
@@ -0,0 +1,139 @@
+"""
+Answers many (start, end) queries against one grid on a process pool.
+
+The walls, and the costs of a weighted grid, are published once in a
+multiprocessing.shared_memory block, every worker copies them into its own
+Graph when it starts and then solves its share of the queries with a_star.
+Results stream back in query order.
+
+Queries between cells of different components are answered None up front from
+the Graph's connectivity index and never reach a worker.
+"""
+import os
+from array import array
+from multiprocessing import Pool, shared_memory
+from graph import Graph
+from node import Node
+from a_star import a_star
+
+# The Graph each worker process solves on, built by _init_worker
+_worker_graph = None
+_worker_lengths_only = False
+
+
+def solve_batch(graph, queries, processes=None, lengths_only=False,
+                chunksize=None):
+    """
+    Yields the answer to every ((start_row, start_col), (end_row, end_col))
+    query in queries, in order, solved on the walls and costs of graph.
+
+    An answer is the number of steps of a cheapest path when lengths_only is
+    set, otherwise an array('i') of the flat cell indices (row * collumns +
+    col) of the path from start to end inclusive. Unreachable queries and
+    queries starting or ending on a wall or outside the grid yield None.
+    """
+
+    queries = list(queries)
+
+    # Also False for cells outside the grid or on a wall
+    possible = [graph.is_connected(*query) for query in queries]
+    solvable = [query for query, ok in zip(queries, possible) if ok]
+
+    if not solvable:
+        for _ in queries:
+            yield None
+        return
+
+    # The cost plane follows the walls, only for a weighted Graph
+    weighted = graph.is_weighted()
+    planes = graph.get_walls()
+
+    if weighted:
+        planes += graph.get_costs()
+
+    memory = shared_memory.SharedMemory(create=True, size=len(planes))
+
+    try:
+        memory.buf[:len(planes)] = planes
+
+        if processes is None:
+            processes = os.cpu_count() or 1
+
+        if chunksize is None:
+            chunksize = max(1, len(solvable) // (4 * processes))
+
+        with Pool(processes, _init_worker,
+                  (memory.name, graph.rows, graph.collumns, graph.start,
+                   graph.end, weighted, lengths_only)) as pool:
+
+            answers = pool.imap(_solve_query, solvable, chunksize)
+
+            for ok in possible:
+                yield next(answers) if ok else None
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def _init_worker(name, rows, collumns, start, end, weighted, lengths_only):
+    """Builds the worker's Graph from the shared walls and costs."""
+
+    global _worker_graph, _worker_lengths_only
+
+    memory = shared_memory.SharedMemory(name=name)
+    size = rows * collumns
+
+    try:
+        walls = bytes(memory.buf[:size])
+        costs = bytes(memory.buf[size:2 * size]) if weighted else None
+    finally:
+        memory.close()
+
+    # Same start and end as the published Graph so that load_walls keeps
+    # exactly its walls, queries pass their own endpoints
+    _worker_graph = Graph(rows, collumns, start, end)
+    _worker_graph.load_walls(walls)
+
+    if costs is not None:
+        _worker_graph.load_costs(costs)
+
+    _worker_lengths_only = lengths_only
+
+
+def _solve_query(query):
+    """Solves one query on the worker's Graph."""
+
+    return solve_query(_worker_graph, query, _worker_lengths_only)
+
+
+def solve_query(graph, query, lengths_only=False):
+    """Solves one query on graph, see solve_batch for the answer format."""
+
+    (start_row, start_col), (end_row, end_col) = query
+    cols = graph.collumns
+    start = start_row * cols + start_col
+    end = end_row * cols + end_col
+
+    for row, col in query:
+        if not (0 <= row < graph.rows and 0 <= col < cols):
+            return None
+        if graph.is_wall((row, col)):
+            return None
+
+    if start == end:
+        return 0 if lengths_only else array("i", [start])
+
+    nodes = a_star(graph, Node(start_row, start_col, graph),
+                   Node(end_row, end_col, graph))
+
+    if not nodes and abs(start_row - end_row) + abs(start_col - end_col) != 1:
+        return None
+
+    if lengths_only:
+        return len(nodes) + 1
+
+    path = array("i", [start])
+    path.extend(node.row * cols + node.col for node in nodes)
+    path.append(end)
+
+    return path
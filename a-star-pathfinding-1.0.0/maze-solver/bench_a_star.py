@@ -0,0 +1,126 @@
+"""
+Compares the expansions per second of a_star with the previous
+PriorityQueue based implementation, kept below as legacy_a_star.
+
+Run with `python maze-solver/bench_a_star.py [size] [repeats]`.
+"""
+import random
+import sys
+import time
+from queue import PriorityQueue
+from graph import Graph
+from a_star import a_star
+from node_type import NodeType, VISITED, PATH
+
+
+def legacy_a_star(graph, start_node, end_node):
+    """a_star as it was before the flat index rewrite, without drawing."""
+
+    def h(n):
+        return abs(end_node.row - n.row) + abs(end_node.col - n.col)
+
+    graph.clear_path()
+
+    open_set = PriorityQueue()
+    came_from = {}
+    g_score = {}
+    f_score = {}
+
+    g_score[start_node] = 0
+    f_score[start_node] = h(start_node)
+
+    open_set.put((f_score[start_node], start_node))
+
+    while not open_set.empty():
+        _, current = open_set.get()
+
+        current.visits()
+
+        if current == end_node:
+            total_path = []
+            current = came_from[end_node]
+            while current != start_node:
+                total_path.insert(0, current)
+                current = came_from[current]
+            for path in total_path:
+                path.update_type(NodeType.PATH)
+            return total_path
+
+        for neighbor in graph.get_open_neighbors(current):
+            tentative_g_score = g_score[current] + 1
+
+            if tentative_g_score < g_score.get(neighbor, float("inf")):
+                came_from[neighbor] = current
+                g_score[neighbor] = tentative_g_score
+                f_score[neighbor] = g_score[neighbor] + h(neighbor)
+
+                if not neighbor.is_visited():
+                    open_set.put((f_score[neighbor], neighbor))
+
+    return []
+
+
+def open_grid(size):
+    """An empty grid with the end in the opposite corner."""
+
+    return Graph(size, size)
+
+
+def random_grid(size, density=0.25, seed=1):
+    """A grid with a random fraction of walls and open corners."""
+
+    rng = random.Random(seed)
+    graph = Graph(size, size)
+
+    for _ in range(int(size * size * density)):
+        graph.make_wall((rng.randrange(size), rng.randrange(size)))
+
+    # Keep the corners open so the start and end are not walled in
+    for i in range(3):
+        for j in range(3):
+            graph.make_empty((i, j))
+            graph.make_empty((size - 1 - i, size - 1 - j))
+
+    return graph
+
+
+def measure(solver, graph, repeats):
+    """Returns (expansions, path length, best seconds) of solver on graph."""
+
+    best = float("inf")
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        path = solver(graph, graph.get_start_node(), graph.get_end_node())
+        best = min(best, time.perf_counter() - start)
+
+    # The start is never marked, every other expanded cell is marked visited
+    # or, if it ended up on the path, path
+    expansions = (graph._cells.count(VISITED) + graph._cells.count(PATH)
+                  + 1)
+    graph.clear_path()
+
+    return expansions, len(path), best
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    grids = [
+        ("open", open_grid(size)),
+        ("random 25%", random_grid(size)),
+    ]
+
+    for name, graph in grids:
+        for solver_name, solver in (("legacy", legacy_a_star),
+                                    ("a_star", a_star)):
+            expansions, length, seconds = measure(solver, graph, repeats)
+            print(f"{name:<12} {solver_name:<8} {expansions:>9} expansions"
+                  f" {seconds * 1000:9.1f} ms"
+                  f" {expansions / seconds:>12,.0f} exp/s"
+                  f"  path {length}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Measures the throughput of solve_batch for 1 up to os.cpu_count() worker
+processes on a random grid.
+
+Run with `python maze-solver/bench_batch.py [size] [queries]`.
+"""
+import os
+import random
+import sys
+import time
+from batch import solve_batch
+from bench_a_star import random_grid
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+
+    graph = random_grid(size, 0.2, seed=1)
+
+    # Not the stream of the walls, which would put every query on a wall
+    rng = random.Random(2)
+
+    def cell():
+        return (rng.randrange(size), rng.randrange(size))
+
+    queries = [(cell(), cell()) for _ in range(count)]
+
+    processes = 1
+
+    while processes <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        solved = sum(1 for length in solve_batch(graph, queries, processes,
+                                                 lengths_only=True)
+                     if length is not None)
+        seconds = time.perf_counter() - start
+
+        print(f"{processes:>3} processes {count / seconds:10.1f} queries/s"
+              f"  ({solved} reachable)")
+        processes *= 2
+
+
+if __name__ == "__main__":
+    main()
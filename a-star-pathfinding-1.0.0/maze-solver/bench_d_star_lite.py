@@ -0,0 +1,54 @@
+"""
+Measures the replan latency of the incremental D* Lite planner under a stream
+of random wall toggles, compared with running a_star from scratch after every
+toggle.
+
+Run with `python maze-solver/bench_d_star_lite.py [size] [toggles]`.
+"""
+import random
+import statistics
+import sys
+import time
+from a_star import a_star
+from d_star_lite import d_star_lite
+from bench_a_star import random_grid
+
+
+def replan_latencies(solver, size, toggles, seed):
+    """Returns the seconds solver takes after each of the random toggles."""
+
+    graph = random_grid(size, 0.2, seed)
+
+    # Not the stream of the walls, which would toggle them back off
+    rng = random.Random(seed + 1)
+
+    # The first plan builds the search, it is not a replan
+    solver(graph, graph.get_start_node(), graph.get_end_node())
+
+    latencies = []
+
+    for _ in range(toggles):
+        graph.toggle_wall((rng.randrange(size), rng.randrange(size)))
+
+        start = time.perf_counter()
+        solver(graph, graph.get_start_node(), graph.get_end_node())
+        latencies.append(time.perf_counter() - start)
+
+    return latencies
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 150
+    toggles = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    for name, solver in (("a_star", a_star), ("d_star_lite", d_star_lite)):
+        latencies = sorted(replan_latencies(solver, size, toggles, seed=1))
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+
+        print(f"{name:<12} median {statistics.median(latencies) * 1000:8.2f} ms"
+              f"  p95 {p95 * 1000:8.2f} ms"
+              f"  max {latencies[-1] * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
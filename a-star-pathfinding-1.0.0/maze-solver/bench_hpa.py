@@ -0,0 +1,106 @@
+"""
+Measures the query latency of hpa_star against a_star on large mazes made by
+maze.generate_maze, along with the time to build the hierarchy and to rebuild
+it after a single make_wall.
+
+Run with `python maze-solver/bench_hpa.py [size] [queries]`.
+"""
+import random
+import statistics
+import sys
+import time
+import maze
+from graph import Graph
+from a_star import a_star
+from hpa_star import hpa_star, Hierarchy, _hierarchies
+from node_type import EMPTY
+
+
+def generated_maze(size, seed):
+    """A recursive division maze of size by size cells, generated at once."""
+
+    graph = Graph(size, size)
+    maze.generate_maze(graph, seed=seed)
+
+    return graph
+
+
+def random_queries(graph, count, rng):
+    """Returns count (start, end) pairs of distinct empty cells."""
+
+    empty = [divmod(index, graph.collumns)
+             for index, code in enumerate(graph._cells) if code == EMPTY]
+
+    return [tuple(rng.sample(empty, 2)) for _ in range(count)]
+
+
+def query_latencies(solver, graph, queries):
+    """
+    Returns the seconds and the path lengths of solver on every query, None
+    for the queries with no path.
+    """
+
+    latencies = []
+    lengths = []
+
+    for start, end in queries:
+        graph.update_start(start)
+        graph.update_end(end)
+
+        begin = time.perf_counter()
+        path = solver(graph, graph.get_start_node(), graph.get_end_node())
+        latencies.append(time.perf_counter() - begin)
+        lengths.append(len(path) if path else None)
+
+    return latencies, lengths
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+
+    graph = generated_maze(size, seed=1)
+    queries = random_queries(graph, count, random.Random(1))
+
+    begin = time.perf_counter()
+    hierarchy = Hierarchy(graph)
+    hierarchy.refresh()
+    print(f"build       {(time.perf_counter() - begin) * 1000:8.1f} ms"
+          f"  {sum(map(len, hierarchy._entrances.values()))} abstract nodes")
+    hierarchy.close()
+
+    results = {}
+
+    for name, solver in (("a_star", a_star), ("hpa_star", hpa_star)):
+        # The first hpa_star query builds the hierarchy, it is not timed
+        solver(graph, graph.get_start_node(), graph.get_end_node())
+
+        latencies, lengths = query_latencies(solver, graph, queries)
+        results[name] = lengths
+
+        print(f"{name:<10}  median {statistics.median(latencies) * 1000:8.2f}"
+              f" ms  max {max(latencies) * 1000:8.2f} ms")
+
+    ratios = [hpa / exact for exact, hpa in zip(results["a_star"],
+                                                results["hpa_star"])
+              if exact and hpa]
+    print(f"path length {statistics.mean(ratios):.3f}x a_star on average,"
+          f" {max(ratios):.3f}x at worst")
+
+    rng = random.Random(2)
+    hierarchy = _hierarchies[graph]
+    rebuilds = []
+
+    for _ in range(count):
+        graph.make_wall((rng.randrange(size), rng.randrange(size)))
+
+        begin = time.perf_counter()
+        hierarchy.refresh()
+        rebuilds.append(time.perf_counter() - begin)
+
+    print(f"rebuild     median {statistics.median(rebuilds) * 1000:8.2f} ms"
+          f" after one make_wall")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Measures how long a fresh interpreter takes to become ready to solve.
+
+Compares importing the headless solver core (Graph and the four solvers) with
+importing pygame and initialising it, which is what every worker paid before
+the rendering was split out of the grid model.
+
+Run with `python maze-solver/bench_startup.py [repeats]`.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+CORE = (
+    "import sys\n"
+    "from graph import Graph\n"
+    "from a_star import a_star\n"
+    "from dijkstra import dijkstra\n"
+    "from d_star import d_star\n"
+    "from d_star_lite import d_star_lite\n"
+    "assert 'pygame' not in sys.modules\n"
+)
+
+CORE_SOLVE = CORE + (
+    "graph = Graph(26, 46)\n"
+    "a_star(graph, graph.get_start_node(), graph.get_end_node())\n"
+)
+
+PYGAME = (
+    "import pygame\n"
+    "pygame.init()\n"
+)
+
+BARE = "pass\n"
+
+
+def time_interpreter(code, repeats):
+    """Returns the startup times in milliseconds of running code."""
+
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy",
+               PYGAME_HIDE_SUPPORT_PROMPT="1")
+    times = []
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=HERE, env=env,
+                       check=True)
+        times.append((time.perf_counter() - start) * 1000)
+
+    return times
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    cases = [
+        ("bare interpreter", BARE),
+        ("solver core import", CORE),
+        ("solver core import + a_star", CORE_SOLVE),
+        ("pygame import + init", PYGAME),
+    ]
+
+    for name, code in cases:
+        try:
+            times = time_interpreter(code, repeats)
+        except subprocess.CalledProcessError:
+            print(f"{name:<30} unavailable")
+            continue
+
+        print(f"{name:<30} median {statistics.median(times):7.1f} ms"
+              f"  min {min(times):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
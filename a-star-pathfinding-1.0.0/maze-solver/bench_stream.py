@@ -0,0 +1,50 @@
+"""
+Measures how fast the streaming maze generators write a maze to disk, in grid
+rows per second, along with the peak memory they use and the time to load
+the file back into a Graph.
+
+Run with `python maze-solver/bench_stream.py [width] [height]`, the size being
+in maze cells. The grid is twice as large minus one in both directions.
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from maze import eller_rows, sidewinder_rows, grid_size
+from grid_file import write_grid, load_graph
+
+
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    height = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    rows, collumns = grid_size(width, height)
+    print(f"grid {rows} x {collumns}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "maze.grid")
+
+        for generator in (eller_rows, sidewinder_rows):
+            begin = time.perf_counter()
+            write_grid(path, rows, collumns, generator(width, height, seed=1))
+            seconds = time.perf_counter() - begin
+
+            # Traced separately, tracemalloc slows the generators down
+            tracemalloc.start()
+            write_grid(path, rows, collumns, generator(width, height, seed=1))
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            begin = time.perf_counter()
+            load_graph(path)
+            load = time.perf_counter() - begin
+
+            print(f"{generator.__name__:<16} {rows / seconds:8.0f} rows/s"
+                  f"  {rows * collumns / seconds / 1e6:6.2f} M cells/s"
+                  f"  peak {peak / 1024:8.0f} KiB"
+                  f"  load {load * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Reproducible benchmark of the solvers across grid kinds, sizes and wall
+densities, with a compare mode to catch regressions between two runs.
+
+Every case is a seeded grid, either a recursive division maze or random walls
+at some density, solved from the top left to the bottom right corner. Every
+run solves on a fresh copy of the grid so that no solver reuses the work of
+the previous run, and the search arrays of the copy are allocated before the
+clock starts. The copies have no connectivity index, the solvers do not build
+one, and the time to build it is reported apart as index_ms. A case records
+the median and minimum time of its timed runs after the warmups, then the
+cells expanded, as counted by SearchStats, the length of the path and the
+peak memory traced during one extra run. compare checks the minimum time,
+the least disturbed by the rest of the machine.
+
+Run with `python maze-solver/benchmark.py run [-o results.json]` and compare
+two result files with
+`python maze-solver/benchmark.py compare old.json new.json`, which exits
+with status 1 when a case got slower by more than the threshold or found a
+path of another length.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from graph import Graph
+from maze import generate_maze
+from search_stats import SearchStats
+from bench_a_star import random_grid
+from a_star import a_star
+from dijkstra import dijkstra
+from d_star import d_star
+from d_star_lite import d_star_lite
+
+SOLVERS = {
+    "a_star": a_star,
+    "dijkstra": dijkstra,
+    "d_star": d_star,
+    "d_star_lite": d_star_lite,
+}
+
+SIZES = (50, 100, 200)
+DENSITIES = (0.1, 0.2, 0.3)
+SEED = 1
+
+# A case is slower when its minimum time grew by more than this fraction
+THRESHOLD = 0.10
+
+
+def grid_walls(kind, size, density, seed):
+    """Returns the walls of a seeded grid of the specified kind."""
+
+    if kind == "maze":
+        graph = Graph(size, size)
+        generate_maze(graph, seed=seed)
+        return graph.get_walls()
+
+    return random_grid(size, density, seed).get_walls()
+
+
+def fresh_graph(size, walls):
+    """Returns a new Graph with walls, its search arrays allocated."""
+
+    graph = Graph(size, size)
+    graph.load_walls(walls)
+    graph.get_search_space()
+
+    return graph
+
+
+def index_time(size, walls):
+    """Returns the seconds taken to build the connectivity index of walls."""
+
+    graph = fresh_graph(size, walls)
+
+    begin = time.perf_counter()
+    graph.get_components().refresh()
+
+    return time.perf_counter() - begin
+
+
+def solve(solver, graph):
+    """Runs solver on graph and returns the seconds it took."""
+
+    begin = time.perf_counter()
+    solver(graph, graph.get_start_node(), graph.get_end_node())
+
+    return time.perf_counter() - begin
+
+
+def run_case(solver, size, walls, warmup, repeats):
+    """Returns the measurements of solver on the grid walls."""
+
+    for _ in range(warmup):
+        solve(solver, fresh_graph(size, walls))
+
+    times = [solve(solver, fresh_graph(size, walls)) for _ in range(repeats)]
+
+    # Counted and traced apart, both slow the solvers down
+    graph = fresh_graph(size, walls)
+    stats = SearchStats()
+    tracemalloc.start()
+    path = solver(graph, graph.get_start_node(), graph.get_end_node(),
+                  stats=stats)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "median_ms": statistics.median(times) * 1000,
+        "min_ms": min(times) * 1000,
+        "times_ms": [seconds * 1000 for seconds in times],
+        "expansions": stats.expanded,
+        "path_length": len(path) if path else None,
+        "peak_kib": peak / 1024,
+    }
+
+
+def run(args):
+    """Runs every case and writes the results as JSON."""
+
+    grids = [("maze", None)] + [("random", density)
+                                for density in args.densities]
+    results = []
+
+    for size in args.sizes:
+        for kind, density in grids:
+            walls = grid_walls(kind, size, density, args.seed)
+            index_ms = index_time(size, walls) * 1000
+
+            print(f"{kind:<6} {size:>5} {density or '':>4} {'index':<12}"
+                  f" {index_ms:9.2f} ms", file=sys.stderr)
+
+            for name in args.algorithms:
+                case = {"grid": kind, "size": size, "density": density,
+                        "algorithm": name, "index_ms": index_ms}
+                case.update(run_case(SOLVERS[name], size, walls,
+                                     args.warmup, args.repeats))
+                results.append(case)
+
+                print(f"{kind:<6} {size:>5} {density or '':>4} {name:<12}"
+                      f" {case['median_ms']:9.2f} ms"
+                      f" {case['expansions']:>8} expanded"
+                      f" {case['peak_kib']:9.1f} KiB"
+                      f"  path {case['path_length']}", file=sys.stderr)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "warmup": args.warmup,
+        "repeats": args.repeats,
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+def case_key(case):
+    """Returns what identifies a case across result files."""
+
+    return (case["grid"], case["size"], case["density"], case["algorithm"])
+
+
+def _order(key):
+    """Sort key of case keys, mazes having no density."""
+
+    grid, size, density, algorithm = key
+    return grid, size, density or 0, algorithm
+
+
+def compare(args):
+    """
+    Prints the change of every case found in both files and returns the
+    exit status, 1 when any case regressed.
+    """
+
+    with open(args.old) as file:
+        old = {case_key(case): case for case in json.load(file)["results"]}
+
+    with open(args.new) as file:
+        new = {case_key(case): case for case in json.load(file)["results"]}
+
+    regressions = 0
+
+    for key in sorted(old.keys() & new.keys(), key=_order):
+        before, after = old[key], new[key]
+        ratio = after["min_ms"] / before["min_ms"]
+        flags = []
+
+        if ratio > 1 + args.threshold:
+            flags.append("SLOWER")
+
+        if after["path_length"] != before["path_length"]:
+            flags.append("PATH CHANGED")
+
+        if after["expansions"] != before["expansions"]:
+            flags.append(f"expansions {before['expansions']} -> "
+                         f"{after['expansions']}")
+
+        if "SLOWER" in flags or "PATH CHANGED" in flags:
+            regressions += 1
+
+        grid, size, density, algorithm = key
+        print(f"{grid:<6} {size:>5} {density or '':>4} {algorithm:<12}"
+              f" {before['min_ms']:9.2f} -> {after['min_ms']:9.2f} ms"
+              f" {ratio:6.2f}x  {' '.join(flags)}")
+
+    for key in sorted(old.keys() ^ new.keys(), key=_order):
+        print(f"only in {'old' if key in old else 'new'}: {key}")
+
+    print(f"{regressions} regression{'s' * (regressions != 1)}")
+
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmark")
+    run_parser.add_argument("-o", "--output", help="JSON file to write")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    run_parser.add_argument("--densities", type=float, nargs="+",
+                            default=DENSITIES)
+    run_parser.add_argument("--algorithms", nargs="+", default=list(SOLVERS),
+                            choices=list(SOLVERS))
+    run_parser.add_argument("--seed", type=int, default=SEED)
+    run_parser.add_argument("--warmup", type=int, default=1)
+    run_parser.add_argument("--repeats", type=int, default=5)
+
+    compare_parser = commands.add_parser(
+        "compare", help="compare two result files")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                                help="slowdown fraction flagged as a "
+                                     "regression")
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        run(args)
+    else:
+        sys.exit(compare(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Bidirectional A* and Dijkstra.
+
+Two searches run at the same time, one forward from the start and one
+backward from the end, always advancing the side with the smaller open list.
+Every time a relaxation reaches a cell already labelled by the other side, the
+best known path length mu is updated. The search stops when no better path
+can exist:
+
+- Dijkstra: the two smallest open distances add up to at least mu.
+- A*: the smallest f of either side is at least mu. The heuristics are
+  Manhattan distances, which are consistent.
+
+Both searches count one per step, on a weighted Graph the path is found by
+dijkstra instead.
+"""
+from heapq import heappush, heappop
+from node import Node
+from node_type import NodeType, EMPTY, VISITED
+from dijkstra import dijkstra
+
+FAILURE = []
+
+FORWARD = 0
+BACKWARD = 1
+
+
+def bidirectional_a_star(graph, start_node, end_node, draw=None):
+    """Finds a shortest path with bidirectional A*."""
+
+    return bidirectional(graph, start_node, end_node, draw, heuristic=True)
+
+
+def bidirectional_dijkstra(graph, start_node, end_node, draw=None):
+    """Finds a shortest path with bidirectional Dijkstra."""
+
+    return bidirectional(graph, start_node, end_node, draw, heuristic=False)
+
+
+def bidirectional(graph, start_node, end_node, draw=None, heuristic=True):
+    """
+    Finds a shortest path from start_node to end_node searching from both
+    ends and returns the Nodes in between, or FAILURE if there is none.
+    """
+
+    if graph.is_weighted():
+        return dijkstra(graph, start_node, end_node, draw)
+
+    graph.clear_path()
+
+    cols = graph.collumns
+    cells = graph._cells
+    touched = graph._touched
+    masks, steps = graph.get_neighbor_index()
+
+    start = start_node.row * cols + start_node.col
+    end = end_node.row * cols + end_node.col
+
+    # There are no cells in between when the start is the end
+    if start == end or graph.is_separated(start, end):
+        return FAILURE
+
+    # The forward search aims at the end, the backward search at the start
+    targets = (divmod(end, cols), divmod(start, cols))
+
+    def h(side, index):
+        if not heuristic:
+            return 0
+        row, col = divmod(index, cols)
+        target_row, target_col = targets[side]
+        return abs(target_row - row) + abs(target_col - col)
+
+    g_score = ({start: 0}, {end: 0})
+    came_from = ({}, {})
+    closed = (set(), set())
+    open_sets = ([(h(FORWARD, start), 0, 0, start)],
+                 [(h(BACKWARD, end), 0, 0, end)])
+    counter = 1
+
+    best = float("inf")
+    meeting = -1
+
+    while open_sets[FORWARD] and open_sets[BACKWARD]:
+        top_forward = open_sets[FORWARD][0][0]
+        top_backward = open_sets[BACKWARD][0][0]
+
+        if heuristic:
+            if top_forward >= best or top_backward >= best:
+                break
+        elif top_forward + top_backward >= best:
+            break
+
+        if len(open_sets[FORWARD]) <= len(open_sets[BACKWARD]):
+            side = FORWARD
+        else:
+            side = BACKWARD
+
+        current = heappop(open_sets[side])[3]
+
+        if current in closed[side]:
+            continue
+
+        closed[side].add(current)
+
+        if cells[current] == EMPTY:
+            cells[current] = VISITED
+            touched.append(current)
+
+        if draw is not None:
+            draw()
+
+        scores = g_score[side]
+        other_scores = g_score[1 - side]
+        tentative_g_score = scores[current] + 1
+
+        for step in steps[masks[current]]:
+            neighbor = current + step
+
+            if neighbor in closed[side]:
+                continue
+
+            if tentative_g_score < scores.get(neighbor, float("inf")):
+                came_from[side][neighbor] = current
+                scores[neighbor] = tentative_g_score
+
+                f_score = tentative_g_score + h(side, neighbor)
+                heappush(open_sets[side],
+                         (f_score, -tentative_g_score, counter, neighbor))
+                counter += 1
+
+            if neighbor in other_scores:
+                length = scores[neighbor] + other_scores[neighbor]
+
+                if length < best:
+                    best = length
+                    meeting = neighbor
+
+    if meeting == -1:
+        return FAILURE
+
+    return reconstruct_path(graph, came_from, start, end, meeting, draw)
+
+
+def reconstruct_path(graph, came_from, start, end, meeting, draw):
+    """
+    Joins the forward chain from start to meeting and the backward chain from
+    meeting to end, marking the cells strictly between start and end as path.
+    """
+
+    cols = graph.collumns
+    forward, backward = came_from
+
+    total_path = []
+    current = meeting
+
+    while current != start:
+        total_path.append(current)
+        current = forward[current]
+
+    total_path.reverse()
+
+    current = meeting
+
+    while current != end:
+        current = backward[current]
+        total_path.append(current)
+
+    # The meeting cell can be the start or the end itself
+    total_path = [index for index in total_path
+                  if index != start and index != end]
+
+    nodes = []
+
+    for index in total_path:
+        node = Node(*divmod(index, cols), graph)
+        node.update_type(NodeType.PATH)
+        nodes.append(node)
+
+        if draw is not None:
+            draw()
+
+    return nodes
@@ -0,0 +1,288 @@
+"""
+Connected components of the passable cells of a Graph.
+
+Every passable cell carries a label and labels are grouped with a union-find,
+two cells are connected when their labels have the same root. The index is
+kept up to date with the Graph's wall edits:
+
+- removing a wall joins the labels of the opened cell's neighbors, a couple of
+  union-find operations;
+- adding a wall can split a component. Breadth first searches start from the
+  neighbors of the new wall and advance one cell each in turn, searches that
+  meet are merged. A group of searches that runs out of cells before the
+  others has found a whole piece that got cut off, and only that piece is
+  relabelled, so the work is bounded by the size of the smaller pieces.
+
+Edits are queued and applied by the next query. When more than a fraction of
+the grid changed at once, like after generating a maze, the labels are
+rebuilt from scratch instead. The solvers never pay for such a rebuild, they
+only consult an index that is ready, see Graph.is_separated.
+"""
+from array import array
+from collections import deque
+from graph import WALL_ADDED, WALL_REMOVED, RESET
+from node_type import WALL
+
+# Queued edits beyond this fraction of the cells trigger a full rebuild
+_REBUILD_FRACTION = 1 / 64
+
+
+class Components:
+    """Connectivity index of a Graph, see Graph.get_components()."""
+
+    def __init__(self, graph):
+        """Constructs the index of graph, labelled on the first query."""
+
+        self.graph = graph
+        self.labels = None
+        self._parent = []
+        self._changed = []
+        graph.subscribe(self._on_change)
+
+    def close(self):
+        """Stops listening to the Graph."""
+
+        self.graph.unsubscribe(self._on_change)
+
+    def _on_change(self, kind, index):
+        """Graph listener, queues the wall edits."""
+
+        if self.labels is None:
+            return
+
+        if kind == WALL_ADDED or kind == WALL_REMOVED:
+            self._changed.append(index)
+        elif kind == RESET:
+            self.labels = None
+
+    def _find(self, label):
+        """Returns the root of label, halving the path on the way."""
+
+        parent = self._parent
+
+        while parent[label] != label:
+            parent[label] = parent[parent[label]]
+            label = parent[label]
+
+        return label
+
+    def _new_label(self):
+        """Returns a fresh root label."""
+
+        label = len(self._parent)
+        self._parent.append(label)
+        return label
+
+    def _build(self):
+        """Labels every passable cell from scratch."""
+
+        graph = self.graph
+        cells = graph._cells
+        masks, steps = graph.get_neighbor_index()
+
+        labels = array("i", [-1]) * len(cells)
+        self.labels = labels
+        self._parent = []
+        self._changed = []
+
+        for index, code in enumerate(cells):
+            if code == WALL or labels[index] != -1:
+                continue
+
+            label = self._new_label()
+            labels[index] = label
+            stack = [index]
+
+            while stack:
+                current = stack.pop()
+
+                for step in steps[masks[current]]:
+                    neighbor = current + step
+
+                    if labels[neighbor] == -1:
+                        labels[neighbor] = label
+                        stack.append(neighbor)
+
+    def is_ready(self):
+        """
+        Returns if the labels are built and refresh() only has to apply the
+        queued edits, without labelling the grid from scratch.
+        """
+
+        return (self.labels is not None
+                and len(self._changed) <= len(self.labels) * _REBUILD_FRACTION)
+
+    def refresh(self):
+        """Brings the labels up to date with the Graph."""
+
+        if self.labels is None:
+            self._build()
+            return
+
+        if not self._changed:
+            return
+
+        changed = set(self._changed)
+        self._changed = []
+
+        if len(changed) > len(self.labels) * _REBUILD_FRACTION:
+            self._build()
+            return
+
+        # The queued edits are applied together against the current grid,
+        # only the final state of every edited cell matters
+        cells = self.graph._cells
+        labels = self.labels
+        closed = [index for index in changed
+                  if cells[index] == WALL and labels[index] != -1]
+        opened = [index for index in changed
+                  if cells[index] != WALL and labels[index] == -1]
+
+        for index in closed:
+            labels[index] = -1
+
+        for index in opened:
+            self._open_cell(index)
+
+        if closed:
+            masks, steps = self.graph.get_neighbor_index()
+            self._split({index + step for index in closed
+                         for step in steps[masks[index]]})
+
+    def _open_cell(self, index):
+        """Labels a cell that stopped being a wall, joining its neighbors."""
+
+        labels = self.labels
+        masks, steps = self.graph.get_neighbor_index()
+        root = -1
+
+        for step in steps[masks[index]]:
+            label = labels[index + step]
+
+            if label == -1:
+                continue
+
+            label = self._find(label)
+
+            if root == -1:
+                root = label
+            elif label != root:
+                self._parent[label] = root
+
+        labels[index] = root if root != -1 else self._new_label()
+
+    def _split(self, seeds):
+        """
+        Relabels the pieces cut off from their component by new walls, seeds
+        being the open neighbors of those walls.
+
+        Every piece of a component that lost cells holds a seed. One search
+        runs from every seed and the searches that meet are grouped. A
+        component is resolved once a single group of its searches is left,
+        that group keeps the label and every other group, which ran out of
+        cells, got a new one.
+        """
+
+        labels = self.labels
+        masks, steps = self.graph.get_neighbor_index()
+
+        seeds = list(seeds)
+        count = len(seeds)
+        roots = [self._find(labels[seed]) for seed in seeds]
+
+        # Groups of searches left per component, and how many groups have to
+        # be merged or cut off in total
+        unresolved = {}
+        for root in roots:
+            unresolved[root] = unresolved.get(root, 0) + 1
+
+        pending = sum(groups - 1 for groups in unresolved.values())
+
+        if not pending:
+            return
+
+        # group is a union-find over the searches, open_count[group] is the
+        # number of its searches that still have cells to expand
+        group = list(range(count))
+        open_count = [1] * count
+        owner = {seed: search for search, seed in enumerate(seeds)}
+        found = [[seed] for seed in seeds]
+        frontiers = [deque([seed]) for seed in seeds]
+
+        def find(search):
+            while group[search] != search:
+                group[search] = group[group[search]]
+                search = group[search]
+            return search
+
+        while pending:
+            for search in range(count):
+                frontier = frontiers[search]
+                component = roots[search]
+
+                if not frontier or unresolved[component] == 1:
+                    continue
+
+                current = frontier.popleft()
+                leader = find(search)
+
+                for step in steps[masks[current]]:
+                    neighbor = current + step
+                    other = owner.get(neighbor)
+
+                    if other is None:
+                        owner[neighbor] = search
+                        found[search].append(neighbor)
+                        frontier.append(neighbor)
+                        continue
+
+                    other_leader = find(other)
+
+                    if other_leader != leader:
+                        # The searches met, they are in the same piece
+                        group[other_leader] = leader
+                        open_count[leader] += open_count[other_leader]
+                        unresolved[component] -= 1
+                        pending -= 1
+
+                        if not pending:
+                            return
+
+                if frontier:
+                    continue
+
+                open_count[leader] -= 1
+
+                if open_count[leader] == 0:
+                    # Every search of the group ran out: it holds a whole
+                    # piece cut off from the rest of the component
+                    label = self._new_label()
+
+                    for member in range(count):
+                        if find(member) == leader:
+                            for cell in found[member]:
+                                labels[cell] = label
+
+                    unresolved[component] -= 1
+                    pending -= 1
+
+                    if not pending:
+                        return
+
+    def label(self, index):
+        """
+        Returns the component of the cell at index, -1 for a wall. Two cells
+        are connected when their components are equal.
+        """
+
+        self.refresh()
+        label = self.labels[index]
+
+        return label if label == -1 else self._find(label)
+
+    def connected(self, a, b):
+        """Returns if the cells at indices a and b are connected."""
+
+        label = self.label(a)
+
+        return label != -1 and label == self.label(b)
@@ -6,3 +6,6 @@ ROWS = (HEIGHT - 2 * PADDING) // NODE_SIZE
 COLUMNS = (WIDTH - 2 * PADDING) // NODE_SIZE
 BORDER = (0x00, 0x7e, 0xa7)
 SLEEP_SPEEP = 0.1 # amount of miliseconds to wait for animation
+MUD_COST = 5 # cost of entering a cell painted as mud
+FPS = 60 # frames per second of the main loops
+PLAYBACK_SECONDS = 1.5 # about how long replaying a search takes on screen
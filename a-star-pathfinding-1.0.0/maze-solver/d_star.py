@@ -1,101 +1,245 @@
-from queue import PriorityQueue
-from node_type import NodeType
+import weakref
+from heapq import heappush, heappop
+from graph import WALL_ADDED, WALL_REMOVED, END_MOVED, RESET
+from node import Node
+from node_type import NodeType, EMPTY, VISITED
+from search_hooks import callbacks
+from dijkstra import dijkstra
 
 FAILURE = []
 
-# Helper function to calculate heuristic (Manhattan distance)
-def h(n, end_node):
-    return abs(end_node.row - n.row) + abs(end_node.col - n.col)
+INFINITY = float("inf")
 
-def d_star(graph, start_node, end_node, draw=None):
-    if draw is None:
-        def draw():
-            return None
+# One goal rooted tree per Graph, reused by every d_star call
+_trees = weakref.WeakKeyDictionary()
+
+
+def d_star(graph, start_node, end_node, draw=None, stats=None, hooks=None):
+    """
+    Finds a shortest path from start_node to end_node and returns the Nodes in
+    between, or FAILURE if there is none.
+
+    The path is read from the Graph's GoalTree, a search tree grown backward
+    from the end. Moving the start only walks parent pointers, the tree is
+    extended when the new start has not been reached yet.
+
+    The work done is recorded in stats when a SearchStats is given, only the
+    part of the tree grown by this call counts, and so are the events
+    reported to hooks when a SearchHooks is given.
+
+    The tree takes every cell to cost 1, on a weighted Graph the path is found
+    by dijkstra instead.
+    """
+
+    if graph.is_weighted():
+        return dijkstra(graph, start_node, end_node, draw, stats, hooks)
+
+    if stats is not None:
+        stats.begin()
+
+    events = callbacks(hooks, draw)
+    on_done = events[4]
+
+    tree = _trees.get(graph)
+
+    if tree is None:
+        tree = GoalTree(graph)
+        _trees[graph] = tree
 
     graph.clear_path()
 
-    # Initialize priority queue (open set)
-    open_set = PriorityQueue()
+    start = start_node.row * graph.collumns + start_node.col
+    goal = end_node.row * graph.collumns + end_node.col
+
+    # There are no cells in between when the start is the end
+    if start == goal or graph.is_separated(start, goal):
+        if stats is not None:
+            stats.end_init()
+            stats.end(FAILURE)
+        if on_done is not None:
+            on_done(FAILURE)
+        return FAILURE
+
+    nodes = tree.path(start, goal, events, stats)
+
+    if on_done is not None:
+        on_done(nodes)
 
-    # Came_from stores the predecessors of each node
-    came_from = {}
+    return nodes
 
-    # g_score: The cost from the start to a given node
-    g_score = {node: float("inf") for row in graph.get_grid() for node in row}
 
-    # rhs_score: The shortest cost to the goal
-    rhs_score = {node: float("inf") for row in graph.get_grid() for node in row}
+class GoalTree:
+    """
+    Shortest path tree rooted at the end of a Graph.
 
-    # Initialize the start and end nodes
-    g_score[start_node] = 0
-    rhs_score[start_node] = h(start_node, end_node)
+    dist holds the distance of every reached cell to the root and parent the
+    next cell towards it. The tree is grown lazily, Dijkstra style, only until
+    the queried start is settled, so the open set is kept between queries.
 
-    # Add the start node to open set (priority queue)
-    open_set.put((rhs_score[start_node], start_node))
+    The tree subscribes to the Graph. Removing a wall next to the tree is
+    repaired locally by giving the opened cell a distance and letting the
+    improvement propagate through the open set. Adding a wall on a reached
+    cell, moving the end or resetting the Graph drops the tree.
+    """
 
-    def update_rhs(node):
-        """Update the rhs_score of the node based on its neighbors."""
-        if node == start_node:
+    def __init__(self, graph):
+        """Constructs an empty tree for graph and subscribes to its changes."""
+
+        self.graph = graph
+        self.cols = graph.collumns
+        self.root = None
+        graph.subscribe(self._on_change)
+
+    def close(self):
+        """Stops listening to the Graph."""
+
+        self.graph.unsubscribe(self._on_change)
+
+    def _on_change(self, kind, index):
+        """Graph listener, repairs or drops the tree."""
+
+        if self.root is None:
             return
 
-        min_rhs = float("inf")
-        for neighbor in graph.get_neighbors(node):
-            if not neighbor.is_wall():
-                cost = g_score[neighbor] + 1  # Assume uniform cost between adjacent nodes
-                min_rhs = min(min_rhs, cost)
-
-        rhs_score[node] = min_rhs
-
-    def replan():
-        """Main loop of the D* algorithm to process and plan the path."""
-        while not open_set.empty():
-            # Get the node with the lowest cost (priority)
-            _, current = open_set.get()
-
-            # Draw the current state of the grid
-            current.visits()
-            draw()
-
-            # If we have reached the goal node, reconstruct the path
-            if current == end_node:
-                return reconstruct_path(came_from, start_node, end_node, draw)
-
-            # Update cost and rhs for each neighbor of the current node
-            for neighbor in graph.get_neighbors(current):
-                if not neighbor.is_wall():
-                    tentative_g_score = g_score[current] + 1  # Assume uniform cost
-                    if tentative_g_score < g_score[neighbor]:
-                        came_from[neighbor] = current
-                        g_score[neighbor] = tentative_g_score
-                        open_set.put((g_score[neighbor], neighbor))
-
-                    update_rhs(neighbor)
-
-    def propagate_changes():
-        """If obstacles appear, propagate the changes from the goal backward."""
-        # Re-plan by propagating changes backward through the graph
-        for node in graph.get_grid():
-            update_rhs(node)
-        
-        replan()
-
-    # Start the process
-    replan()
-
-    return FAILURE
-
-def reconstruct_path(came_from, start, end, draw):
-    """Reconstruct and return the path from start to end node."""
-    current = came_from[end]
-    total_path = []
-
-    while current != start:
-        total_path.insert(0, current)
-        current = came_from[current]
-
-    # Mark the nodes in the path and update the visual grid
-    for path in total_path:
-        path.update_type(NodeType.PATH)
-        draw()
-
-    return total_path
+        if kind == WALL_REMOVED:
+            self._open_cell(index)
+        elif kind == WALL_ADDED:
+            if index in self.dist:
+                self.root = None
+        elif kind == END_MOVED or kind == RESET:
+            self.root = None
+
+    def _grow_from(self, root):
+        """Starts a new tree at root."""
+
+        self.root = root
+        self.dist = {root: 0}
+        self.parent = {}
+        self.open_set = [(0, root)]
+
+    def _open_cell(self, index):
+        """Attaches a cell that stopped being a wall to its best neighbor."""
+
+        masks, steps = self.graph.get_neighbor_index()
+        dist = self.dist
+        best, best_neighbor = INFINITY, -1
+
+        for step in steps[masks[index]]:
+            score = dist.get(index + step, INFINITY)
+            if score < best:
+                best, best_neighbor = score, index + step
+
+        if best_neighbor != -1:
+            dist[index] = best + 1
+            self.parent[index] = best_neighbor
+            heappush(self.open_set, (best + 1, index))
+
+    def _settle(self, start, on_expand, on_push, on_relax, stats=None,
+                pushes=0):
+        """
+        Expands the open set until the distance of start is final, that is
+        until nothing left in the open set can improve it. pushes counts the
+        entries this call pushed before, for stats.
+        """
+
+        cols = self.cols
+        graph = self.graph
+        cells = graph._cells
+        touched = graph._touched
+        masks, steps = graph.get_neighbor_index()
+        dist, parent, open_set = self.dist, self.parent, self.open_set
+
+        track = stats is not None
+        expanded = stale = 0
+        peak_open = len(open_set)
+
+        while open_set and open_set[0][0] < dist.get(start, INFINITY):
+            score, current = open_set[0]
+
+            if score > dist[current]:
+                heappop(open_set)
+                stale += 1
+                continue
+
+            expanded += 1
+
+            if cells[current] == EMPTY:
+                cells[current] = VISITED
+                touched.append(current)
+
+            # Popped only after on_expand, which may raise to cancel the
+            # search, so that the tree stays resumable
+            if on_expand is not None:
+                on_expand(*divmod(current, cols), score, score)
+
+            heappop(open_set)
+
+            score += 1
+
+            for step in steps[masks[current]]:
+                neighbor = current + step
+
+                if score < dist.get(neighbor, INFINITY):
+                    dist[neighbor] = score
+                    parent[neighbor] = current
+                    heappush(open_set, (score, neighbor))
+                    pushes += 1
+
+                    if on_relax is not None:
+                        on_relax(*divmod(neighbor, cols), score)
+
+                    if on_push is not None:
+                        on_push(*divmod(neighbor, cols), score, score)
+
+            if track and len(open_set) > peak_open:
+                peak_open = len(open_set)
+
+        if track:
+            stats.end_search(expanded, pushes, expanded + stale, stale,
+                             peak_open)
+
+    def path(self, start, goal, events, stats=None):
+        """
+        Returns the Nodes strictly between start and goal, following parent
+        pointers, and marks them as path. events are the callbacks returned
+        by search_hooks.callbacks, on_done aside.
+        """
+
+        on_expand, on_push, on_relax, on_path_node, _ = events
+        pushes = 0
+
+        if self.root != goal:
+            self._grow_from(goal)
+            pushes = 1
+
+            if on_push is not None:
+                on_push(*divmod(goal, self.cols), 0, 0)
+
+        if stats is not None:
+            stats.end_init()
+
+        self._settle(start, on_expand, on_push, on_relax, stats, pushes)
+
+        if start not in self.dist:
+            if stats is not None:
+                stats.end(FAILURE)
+            return FAILURE
+
+        parent = self.parent
+        nodes = []
+        current = parent[start]
+
+        while current != goal:
+            node = Node(*divmod(current, self.cols), self.graph)
+            node.update_type(NodeType.PATH)
+            nodes.append(node)
+
+            if on_path_node is not None:
+                on_path_node(node.row, node.col)
+
+            current = parent[current]
+
+        if stats is not None:
+            stats.end(nodes)
+
+        return nodes
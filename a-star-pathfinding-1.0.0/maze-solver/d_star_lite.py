@@ -1,89 +1,367 @@
-from queue import PriorityQueue
-from node_type import NodeType
+import weakref
+from heapq import heappush, heappop
+from graph import WALL_ADDED, WALL_REMOVED, END_MOVED, RESET
+from node import Node
+from node_type import NodeType, EMPTY, VISITED, WALL
+from search_hooks import callbacks
+from dijkstra import dijkstra
 
 FAILURE = []
 
-def d_star_lite(graph, start_node, end_node, draw=None, h=None):
-    if h is None:
-        def h(n):
-            return abs(end_node.row - n.row) + abs(end_node.col - n.col)
+INFINITY = float("inf")
 
-    if draw is None:
-        def draw():
-            return None
+# One persistent planner per Graph, reused by every d_star_lite call
+_planners = weakref.WeakKeyDictionary()
 
-    graph.clear_path()
 
-    # Initialize priority queue (open set)
-    open_set = PriorityQueue()
+def d_star_lite(graph, start_node, end_node, draw=None, h=None, stats=None,
+                hooks=None):
+    """
+    Finds a shortest path from start_node to end_node and returns the Nodes in
+    between, or FAILURE if there is none.
 
-    # Came_from stores the predecessors of each node
-    came_from = {}
+    The Graph's DStarLite planner is kept between calls, so after wall edits
+    or a start move only the affected part of the search is repaired. The
+    planner always uses the Manhattan distance, h is accepted so callers of
+    the other solvers can pass theirs.
 
-    # g_score: The cost from the start to a given node
-    g_score = {node: float("inf") for row in graph.get_grid() for node in row}
+    The work done is recorded in stats when a SearchStats is given, only the
+    repairs made by this call count, and so are the events reported to hooks
+    when a SearchHooks is given.
 
-    # rhs_score: The shortest cost to the goal (in D* Lite, this value is used for node re-planning)
-    rhs_score = {node: float("inf") for row in graph.get_grid() for node in row}
+    The planner takes every cell to cost 1, on a weighted Graph the path is
+    found by dijkstra instead.
+    """
 
-    # Initialize the start and end nodes
-    g_score[start_node] = 0
-    rhs_score[start_node] = h(start_node)
+    if graph.is_weighted():
+        return dijkstra(graph, start_node, end_node, draw, stats, hooks)
 
-    # Initialize the open_set with the start node
-    open_set.put((rhs_score[start_node], start_node))
+    planner = _planners.get(graph)
 
-    def update_node_costs(node):
-        if node == start_node:
-            return
+    if planner is None:
+        planner = DStarLite(graph)
+        _planners[graph] = planner
 
-        min_rhs = float("inf")
-        for neighbor in graph.get_neighbors(node):
-            if not neighbor.is_wall():
-                cost = g_score[neighbor] + 1  # Cost between adjacent nodes is 1
-                min_rhs = min(min_rhs, cost)
+    return planner.plan(start_node, end_node, draw, stats, hooks)
 
-        rhs_score[node] = min_rhs
 
-    def get_min_rhs():
-        return open_set.get() if not open_set.empty() else None
+class DStarLite:
+    """
+    Incremental D* Lite planner (Koenig and Likhachev) bound to a Graph.
 
-    while not open_set.empty():
-        # Get the node with the lowest cost (priority)
-        _, current = open_set.get()
+    The search runs backward from the end, so g and rhs hold distances to the
+    end and the path is read off from the start by following the smallest g.
+    The planner subscribes to the Graph: wall changes are queued and repaired
+    by the next plan() call with UpdateVertex on the edited cell and its
+    neighbors, start moves are absorbed by the km key offset and only an end
+    move or a reset of the Graph starts the search over.
+    """
 
-        # Draw the current state
-        current.visits()
-        draw()
+    def __init__(self, graph):
+        """Constructs a planner for graph and subscribes to its changes."""
 
-        if current == end_node:
-            return reconstruct_path(came_from, start_node, end_node, draw)
+        self.graph = graph
+        self.cols = graph.collumns
+        self._changed = set()
+        self._restart = True
+        # Outdated entries dropped from the open set, ever
+        self.stale_pops = 0
+        # Callbacks of the running plan(), needed deep in the updates
+        self._on_push = None
+        self._on_relax = None
+        graph.subscribe(self._on_change)
 
-        # Update cost and rhs for each neighbor
-        for neighbor in graph.get_neighbors(current):
-            if not neighbor.is_wall():
-                tentative_g_score = g_score[current] + 1  # assuming uniform cost for movement
-                if tentative_g_score < g_score[neighbor]:
-                    came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g_score
-                    open_set.put((g_score[neighbor], neighbor))
+    def close(self):
+        """Stops listening to the Graph."""
 
-                update_node_costs(neighbor)
+        self.graph.unsubscribe(self._on_change)
 
-    return FAILURE
+    def _on_change(self, kind, index):
+        """Graph listener, records what the next plan() has to repair."""
 
+        if kind == WALL_ADDED or kind == WALL_REMOVED:
+            self._changed.add(index)
+        elif kind == END_MOVED or kind == RESET:
+            self._restart = True
 
-def reconstruct_path(came_from, start, end, draw):
-    current = came_from[end]
-    total_path = []
+    def _reset(self, start, goal):
+        """Starts a new search towards goal."""
 
-    while current != start:
-        total_path.insert(0, current)
-        current = came_from[current]
+        self.start = start
+        self.goal = goal
+        self.last = start
+        self.km = 0
+        self.g = {}
+        self.rhs = {goal: 0}
+        self.open_set = []
+        self.keys = {}
+        self.counter = 0
+        self._changed.clear()
+        self._restart = False
+        self._insert(goal, self.calculate_key(goal))
 
-    # Mark the nodes in the path and update the visual grid
-    for path in total_path:
-        path.update_type(NodeType.PATH)
-        draw()
+    def h(self, a, b):
+        """Manhattan distance between the cells at indices a and b."""
 
-    return total_path
+        a_row, a_col = divmod(a, self.cols)
+        b_row, b_col = divmod(b, self.cols)
+        return abs(a_row - b_row) + abs(a_col - b_col)
+
+    def calculate_key(self, index):
+        """Returns the (k1, k2) priority of the cell at index."""
+
+        score = min(self.g.get(index, INFINITY),
+                    self.rhs.get(index, INFINITY))
+        return (score + self.h(self.start, index) + self.km, score)
+
+    def _insert(self, index, key):
+        """Inserts or re-keys index in the open set."""
+
+        self.keys[index] = key
+        heappush(self.open_set, (key[0], key[1], self.counter, index))
+        self.counter += 1
+
+        if self._on_push is not None:
+            self._on_push(*divmod(index, self.cols), key[1], key[0])
+
+    def _top_key(self):
+        """Returns the smallest key in the open set, dropping stale entries."""
+
+        open_set = self.open_set
+
+        while open_set:
+            k1, k2, _, index = open_set[0]
+
+            if self.keys.get(index) == (k1, k2):
+                return (k1, k2)
+
+            heappop(open_set)
+            self.stale_pops += 1
+
+        return (INFINITY, INFINITY)
+
+    def update_vertex(self, index):
+        """UpdateVertex: recomputes rhs of index and fixes its membership."""
+
+        graph = self.graph
+
+        if index != self.goal:
+            if graph._cells[index] == WALL:
+                best = INFINITY
+            else:
+                masks, steps = graph.get_neighbor_index()
+                g = self.g
+                best = INFINITY
+
+                for step in steps[masks[index]]:
+                    score = g.get(index + step, INFINITY) + 1
+                    if score < best:
+                        best = score
+
+            if (self._on_relax is not None
+                    and best != self.rhs.get(index, INFINITY)):
+                self._on_relax(*divmod(index, self.cols), best)
+
+            self.rhs[index] = best
+
+        self.keys.pop(index, None)
+
+        if self.g.get(index, INFINITY) != self.rhs.get(index, INFINITY):
+            self._insert(index, self.calculate_key(index))
+
+    def compute_shortest_path(self, on_expand=None, stats=None):
+        """
+        ComputeShortestPath: expands cells until the start is consistent.
+        Returns how many cells were expanded, how many entries were popped,
+        including the ones queued again with a larger key, and the peak size
+        of the open set when stats is given.
+        """
+
+        graph = self.graph
+        cells = graph._cells
+        touched = graph._touched
+        masks, steps = graph.get_neighbor_index()
+        g, rhs = self.g, self.rhs
+        start = self.start
+
+        track = stats is not None
+        expanded = popped = 0
+        peak_open = len(self.open_set)
+
+        while True:
+            if track and len(self.open_set) > peak_open:
+                peak_open = len(self.open_set)
+
+            top_key = self._top_key()
+            start_rhs = rhs.get(start, INFINITY)
+
+            if (top_key >= self.calculate_key(start)
+                    and start_rhs == g.get(start, INFINITY)):
+                return expanded, popped, peak_open
+
+            if top_key == (INFINITY, INFINITY):
+                return expanded, popped, peak_open
+
+            index = self.open_set[0][3]
+            new_key = self.calculate_key(index)
+
+            if cells[index] == EMPTY:
+                cells[index] = VISITED
+                touched.append(index)
+
+            if top_key < new_key:
+                heappop(self.open_set)
+                popped += 1
+                self._insert(index, new_key)
+                continue
+
+            # Popped only after on_expand, which may raise to cancel the
+            # search, so that the planner stays consistent
+            if on_expand is not None:
+                on_expand(*divmod(index, self.cols), top_key[1], top_key[0])
+
+            heappop(self.open_set)
+            popped += 1
+            expanded += 1
+            del self.keys[index]
+            neighbors = [index + step for step in steps[masks[index]]]
+
+            if g.get(index, INFINITY) > rhs.get(index, INFINITY):
+                g[index] = rhs[index]
+            else:
+                g[index] = INFINITY
+                neighbors.append(index)
+
+            for neighbor in neighbors:
+                self.update_vertex(neighbor)
+
+    def _apply_changes(self):
+        """Repairs the search after the queued wall changes."""
+
+        cols, size = self.cols, len(self.graph._cells)
+
+        for index in self._changed:
+            self.update_vertex(index)
+
+            # Every neighbor in the grid, walls included, lost or gained an
+            # edge to index
+            row, col = divmod(index, cols)
+            for neighbor, inside in ((index - cols, row > 0),
+                                     (index - 1, col > 0),
+                                     (index + 1, col < cols - 1),
+                                     (index + cols, index + cols < size)):
+                if inside:
+                    self.update_vertex(neighbor)
+
+        self._changed.clear()
+
+    def plan(self, start_node, end_node, draw=None, stats=None, hooks=None):
+        """
+        Brings the search up to date with the Graph and returns the Nodes
+        strictly between start_node and end_node on a shortest path.
+        """
+
+        if stats is not None:
+            stats.begin()
+
+        events = callbacks(hooks, draw)
+        on_expand, on_push, on_relax, on_path_node, on_done = events
+        self._on_push, self._on_relax = on_push, on_relax
+
+        graph = self.graph
+        graph.clear_path()
+
+        start = start_node.row * self.cols + start_node.col
+        goal = end_node.row * self.cols + end_node.col
+
+        if graph.is_separated(start, goal):
+            if stats is not None:
+                stats.end_init()
+                stats.end(FAILURE)
+            if on_done is not None:
+                on_done(FAILURE)
+            return FAILURE
+
+        if self._restart or goal != self.goal:
+            self._reset(start, goal)
+            # The counter starts over, the goal it pushed is part of this call
+            pushes = 0
+        else:
+            # Entries pushed by earlier calls
+            pushes = self.counter
+
+            if start != self.last:
+                # The keys in the open set were computed from the previous
+                # start, km keeps them lower bounds after the move
+                self.start = start
+                self.km += self.h(self.last, start)
+                self.last = start
+
+        if stats is None:
+            if self._changed:
+                self._apply_changes()
+
+            self.compute_shortest_path(on_expand)
+            nodes = self.reconstruct_path(on_path_node)
+        else:
+            stats.end_init()
+            stale_pops = self.stale_pops
+
+            if self._changed:
+                self._apply_changes()
+
+            expanded, popped, peak_open = self.compute_shortest_path(
+                on_expand, stats)
+            stale_pops = self.stale_pops - stale_pops
+            stats.end_search(expanded, self.counter - pushes,
+                             popped + stale_pops, stale_pops, peak_open)
+
+            nodes = self.reconstruct_path(on_path_node)
+            stats.end(nodes)
+
+        if on_done is not None:
+            on_done(nodes)
+
+        return nodes
+
+    def reconstruct_path(self, on_path_node=None):
+        """
+        Follows the smallest g + 1 from the start to the goal and marks the
+        cells in between as path, passing their coordinates to on_path_node.
+        """
+
+        g = self.g
+        start, goal = self.start, self.goal
+        length = self.rhs.get(start, INFINITY)
+
+        if length == INFINITY:
+            return FAILURE
+
+        masks, steps = self.graph.get_neighbor_index()
+        total_path = []
+        current = start
+
+        # A shortest path has exactly length steps, the bound only guards
+        # against walking in circles
+        for _ in range(int(length)):
+            current = min((current + step for step in steps[masks[current]]),
+                          key=lambda index: g.get(index, INFINITY))
+
+            if current == goal:
+                break
+
+            total_path.append(current)
+        else:
+            return FAILURE
+
+        nodes = []
+
+        for index in total_path:
+            node = Node(*divmod(index, self.cols), self.graph)
+            node.update_type(NodeType.PATH)
+            nodes.append(node)
+
+            if on_path_node is not None:
+                on_path_node(node.row, node.col)
+
+        return nodes
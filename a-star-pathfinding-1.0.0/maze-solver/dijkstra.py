@@ -1,62 +1,153 @@
-import heapq
-from node_type import NodeType
-
-def dijkstra(graph, start_node, end_node, draw=None):
-    open_set = []
-    heapq.heappush(open_set, (0, start_node))  # Priority queue, starting with the start node
-    came_from = {}
-    g_score = {node: float("inf") for row in graph.get_grid() for node in row}
-    g_score[start_node] = 0
-    visited_nodes = set()
-    
-    # Flag to track if the search has been completed
-    path_found = False
-
-    while open_set:
-        current_cost, current_node = heapq.heappop(open_set)
-
-        # Skip visited nodes to avoid redundant processing
-        if current_node in visited_nodes:
-            continue
-
-        visited_nodes.add(current_node)
-
-        # When we reach the end node, we stop searching and reconstruct the path
-        if current_node == end_node:
-            path_found = True
-            break
-
-        for neighbor in graph.get_neighbors(current_node):
-            if neighbor.is_wall() or neighbor in visited_nodes:
+"""
+Dijkstra on the Graph's cost layer with a bucket queue (Dial's algorithm).
+
+Costs are small integers, so instead of a heap the open cells are kept in a
+ring of max_cost + 1 buckets, a cell at distance d sitting in bucket
+d % (max_cost + 1). A relaxation adds at most max_cost to the distance being
+swept, so every pending distance maps to its own bucket and the buckets are
+simply visited in order. Without a heap the search is O(E + max_cost * V).
+"""
+from node_type import EMPTY, VISITED
+from a_star import resconstruct_path
+from search_hooks import callbacks
+
+FAILURE = []
+
+
+def dijkstra(graph, start_node, end_node, draw=None, stats=None, hooks=None):
+    """
+    Finds a cheapest path from start_node to end_node, entering a cell costing
+    its value in the Graph's cost layer, and returns the Nodes in between, or
+    FAILURE if there is none.
+
+    The work done is recorded in stats when a SearchStats is given, and the
+    events of the search are reported to hooks when a SearchHooks is given.
+    """
+
+    if stats is not None:
+        stats.begin()
+
+    events = callbacks(hooks, draw)
+    on_expand, on_push, on_relax, on_path_node, on_done = events
+
+    graph.clear_path()
+
+    cols = graph.collumns
+    cells = graph._cells
+    touched = graph._touched
+    costs = graph.get_costs()
+    masks, steps = graph.get_neighbor_index()
+
+    space = graph.get_search_space()
+    generation = space.begin()
+    stamp = space.stamp
+    g_score = space.g_score
+    came_from = space.came_from
+
+    start = start_node.row * cols + start_node.col
+    end = end_node.row * cols + end_node.col
+
+    # There are no cells in between when the start is the end
+    if start == end or graph.is_separated(start, end):
+        if stats is not None:
+            stats.end_init()
+            stats.end(FAILURE)
+        if on_done is not None:
+            on_done(FAILURE)
+        return FAILURE
+
+    stamp[start] = generation
+    g_score[start] = 0
+
+    ring = graph.get_max_cost() + 1
+    buckets = [[] for _ in range(ring)]
+    buckets[0].append(start)
+    pending = 1
+    distance = 0
+
+    if on_push is not None:
+        on_push(start_node.row, start_node.col, 0, 0)
+
+    # Entries are counted a bucket at a time: every push is either swept or
+    # still pending, and the open set is largest right before a sweep
+    swept = expanded = stale = peak_open = 0
+
+    if stats is not None:
+        stats.end_init()
+
+    while pending:
+        slot = distance % ring
+        bucket = buckets[slot]
+
+        if bucket:
+            if pending > peak_open:
+                peak_open = pending
+
+            # Nothing pushed while sweeping lands in this bucket again
+            buckets[slot] = []
+            pending -= len(bucket)
+            swept += len(bucket)
+
+        for current in bucket:
+            # An entry is stale when the cell was reached cheaper since, the
+            # cells already settled are never improved upon
+            if g_score[current] != distance:
+                stale += 1
                 continue
 
-            tentative_g_score = g_score[current_node] + 1
+            expanded += 1
+
+            if cells[current] == EMPTY:
+                cells[current] = VISITED
+                touched.append(current)
+
+            if on_expand is not None:
+                on_expand(*divmod(current, cols), distance, distance)
+
+            if current == end:
+                if stats is not None:
+                    stats.end_search(expanded, swept + pending,
+                                     expanded + stale, stale, peak_open)
+
+                nodes = resconstruct_path(graph, came_from, start, end,
+                                          on_path_node)
+
+                if stats is not None:
+                    stats.end(nodes)
+
+                if on_done is not None:
+                    on_done(nodes)
 
-            if tentative_g_score < g_score[neighbor]:
-                came_from[neighbor] = current_node
+                return nodes
+
+            for step in steps[masks[current]]:
+                neighbor = current + step
+                tentative_g_score = distance + costs[neighbor]
+
+                if stamp[neighbor] != generation:
+                    stamp[neighbor] = generation
+                elif tentative_g_score >= g_score[neighbor]:
+                    continue
+
+                came_from[neighbor] = current
                 g_score[neighbor] = tentative_g_score
-                heapq.heappush(open_set, (g_score[neighbor], neighbor))
-
-        # Redraw only if something meaningful changes
-        if draw:
-            draw()
-
-    if path_found:
-        return reconstruct_path(came_from, start_node, end_node, draw)
-    else:
-        return []
-
-def reconstruct_path(came_from, start, end, draw):
-    current = end
-    path = []
-    while current != start:
-        path.append(current)
-        current = came_from[current]
-    path.reverse()
-
-    for node in path:
-        node.update_type(NodeType.PATH)
-        if draw:
-            draw()
-
-    return path
+                buckets[tentative_g_score % ring].append(neighbor)
+                pending += 1
+
+                if on_relax is not None:
+                    on_relax(*divmod(neighbor, cols), tentative_g_score)
+
+                if on_push is not None:
+                    on_push(*divmod(neighbor, cols), tentative_g_score,
+                            tentative_g_score)
+
+        distance += 1
+
+    if stats is not None:
+        stats.end_search(expanded, swept, swept, stale, peak_open)
+        stats.end(FAILURE)
+
+    if on_done is not None:
+        on_done(FAILURE)
+
+    return FAILURE
@@ -1,14 +1,65 @@
-import pygame
+from collections import Counter
 from node import Node
-from node_type import NodeType
-from constants import NODE_SIZE, BORDER, PADDING
+from search_space import SearchSpace
+from node_type import EMPTY, WALL, START, END, VISITED, PATH
 
 HORIZONTAL = 0
 VERTICAL = 1
 
+# Bits of a cell's open direction mask, a bit is set when the neighbor in
+# that direction is inside the grid and is not a wall.
+UP = 1
+LEFT = 2
+RIGHT = 4
+DOWN = 8
+
+# Kinds of changes reported to the listeners of a Graph. Listeners are called
+# as listener(kind, index) with the index of the affected cell, or None for
+# RESET when the whole grid changed.
+WALL_ADDED = 0
+WALL_REMOVED = 1
+START_MOVED = 2
+END_MOVED = 3
+RESET = 4
+COST_CHANGED = 5
+
+# Cost of entering a cell that was never painted, and the largest cost a cell
+# can hold in the one byte cost layer
+DEFAULT_COST = 1
+MAX_COST = 255
+
+# Maps a wall code to 0 and every other code to 1
+_PASSABLE = bytes(0 if code == WALL else 1 for code in range(256))
+
+# Maps a wall code to 1 and every other code to 0
+_WALLS = bytes(1 if code == WALL else 0 for code in range(256))
+
+# Maps a non zero byte to a wall code and 0 to an empty code
+_WALL_CODES = bytes([EMPTY]) + bytes([WALL]) * 255
+
 
 class Graph:
-    """Represents a Graph as a grid (2d list)."""
+    """
+    Represents a Graph as a grid.
+
+    The state of every cell is stored as a one byte code (see node_type) in a
+    single row-major bytearray, the cell at (row, col) lives at index
+    row * collumns + col. Node objects are only created as views of a cell
+    when a caller asks for one.
+
+    Alongside the cells the Graph keeps a neighbor index: one byte per cell
+    with a bit set (UP, LEFT, RIGHT, DOWN) for every passable neighbor. Wall
+    edits only patch the masks of the four cells around the edited one.
+
+    Visited and path marks are recorded in a dirty list as they are made, so
+    clearing them only touches the cells marked by the previous search.
+
+    A second bytearray holds the cost of entering every cell, 1 to MAX_COST.
+    Walls are not costs, a wall cell keeps its cost for when it is opened.
+
+    Objects that keep state derived from the grid can subscribe() to be told
+    about wall, start and end changes.
+    """
     
 
     def __init__(self, rows, collumns, start=(0, 0), end=None):
@@ -21,21 +72,202 @@ class Graph:
 
         self.start = start
 
-        self._grid = []
         self.rows = rows
         self.collumns = collumns
 
-        for row in range(rows):
-            self._grid.append([])
-            for col in range(collumns):
-                if (row, col) == self.start:
-                    node_type = NodeType.START
-                elif (row, col) == self.end:
-                    node_type = NodeType.END
-                else:
-                    node_type = NodeType.EMPTY
+        self._cells = bytearray(rows * collumns)
+        self._cells[self._index(self.start)] = START
+        self._cells[self._index(self.end)] = END
+
+        # Indices marked visited or path, or unmarked, since the last
+        # clear_path
+        self._touched = []
+        self._wall_count = 0
+        # Bumped every time a wall or a cost changes
+        self.version = 0
+
+        self._costs = bytearray([DEFAULT_COST]) * (rows * collumns)
+        # Number of cells whose cost is not DEFAULT_COST
+        self._weighted_count = 0
+        # Number of cells of every cost, for get_min_cost and get_max_cost
+        self._cost_counts = [0] * (MAX_COST + 1)
+        self._cost_counts[DEFAULT_COST] = rows * collumns
+        self._search_space = None
+        self._components = None
+        self._listeners = []
+
+        # Index deltas of the passable neighbors for every possible mask
+        self._steps = tuple(
+            tuple(step for bit, step in ((UP, -collumns), (LEFT, -1),
+                                         (RIGHT, 1), (DOWN, collumns))
+                  if mask & bit)
+            for mask in range(16)
+        )
+        self._build_index()
+
+    def _build_index(self):
+        """
+        Rebuilds the open direction mask of every cell from the cell array.
+
+        Each direction is computed as a shifted copy of the passable plane and
+        the four planes are combined as big integers, so the whole rebuild
+        runs at C speed.
+        """
+
+        size = self.rows * self.collumns
+        cols = self.collumns
+        passable = bytes(self._cells).translate(_PASSABLE)
+
+        # 1 for every cell that has a column to its left / right
+        has_left = (b"\x00" + b"\x01" * (cols - 1)) * self.rows
+        has_right = (b"\x01" * (cols - 1) + b"\x00") * self.rows
+
+        def plane(shifted):
+            return int.from_bytes(shifted, "little")
+
+        up = plane(bytes(cols) + passable[:size - cols])
+        down = plane(passable[cols:] + bytes(cols))
+        left = plane(b"\x00" + passable[:size - 1]) & plane(has_left)
+        right = plane(passable[1:] + b"\x00") & plane(has_right)
 
-                self._grid[row].append(Node(row, col, node_type))
+        masks = up | left << 1 | right << 2 | down << 3
+        self._open = bytearray(masks.to_bytes(size, "little"))
+
+    def get_neighbor_index(self):
+        """
+        Returns the (masks, steps) pair of the neighbor index.
+
+        masks[i] is the open direction mask of the cell at index i and
+        steps[mask] the index deltas of the neighbors open in that mask, so
+        the passable neighbors of i are i + step for step in steps[masks[i]].
+        """
+
+        return self._open, self._steps
+
+    def get_search_space(self):
+        """
+        Returns the SearchSpace of this Graph, allocating it on first use.
+        """
+
+        if self._search_space is None:
+            self._search_space = SearchSpace(self.rows * self.collumns)
+
+        return self._search_space
+
+    def get_components(self):
+        """
+        Returns the connectivity index of this Graph, creating it on first
+        use. It is kept up to date with the walls from then on.
+        """
+
+        if self._components is None:
+            # connectivity imports the change kinds from this module
+            from connectivity import Components
+
+            self._components = Components(self)
+
+        return self._components
+
+    def is_separated(self, a, b):
+        """
+        Returns if the cells at indices a and b are in different components,
+        as far as the connectivity index tells without labelling the grid.
+
+        Labelling the grid visits every cell, far more than most searches do,
+        so the solvers only consult an index that callers answering many
+        queries built beforehand, through is_connected or get_components().
+        False when there is no index, or when it would have to be rebuilt.
+        """
+
+        components = self._components
+
+        return (components is not None and components.is_ready()
+                and not components.connected(a, b))
+
+    def is_connected(self, a, b):
+        """
+        Returns if a path exists between the specified (row, col) a and b.
+        """
+
+        if not (self.__in_grid(a) and self.__in_grid(b)):
+            return False
+
+        return self.get_components().connected(self._index(a), self._index(b))
+
+    def _index(self, coordinate):
+        """Returns the index of the specified (row, col) in the cell array."""
+
+        row, col = coordinate
+        return row * self.collumns + col
+
+    def _set(self, index, code):
+        """Sets the cell at the specified index to the specified code."""
+
+        cells = self._cells
+        old_code = cells[index]
+        was_wall = old_code == WALL
+        cells[index] = code
+
+        if (code == VISITED or code == PATH
+                or old_code == VISITED or old_code == PATH):
+            # Unmarked cells are recorded too so that renderers see them
+            self._touched.append(index)
+
+        # A marked cell can be walled over, this is not an elif
+        if was_wall != (code == WALL):
+            self._wall_count += -1 if was_wall else 1
+            self.version += 1
+            self._patch_index(index, was_wall)
+
+            if self._listeners:
+                self._notify(WALL_REMOVED if was_wall else WALL_ADDED, index)
+
+    def subscribe(self, listener):
+        """
+        Registers listener(kind, index) to be called after every wall, start,
+        end or cost change, see WALL_ADDED, WALL_REMOVED, START_MOVED,
+        END_MOVED, RESET and COST_CHANGED.
+        """
+
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        """Removes a listener registered with subscribe()."""
+
+        self._listeners.remove(listener)
+
+    def _notify(self, kind, index):
+        """Calls every listener with the specified change."""
+
+        for listener in list(self._listeners):
+            listener(kind, index)
+
+    def _patch_index(self, index, opened):
+        """
+        Updates the masks of the neighbors of the cell at the specified index
+        after it became passable (opened) or a wall.
+        """
+
+        masks = self._open
+        cols = self.collumns
+        row, col = divmod(index, cols)
+
+        # (neighbor index, bit of the neighbor pointing back at index)
+        around = []
+        if row > 0:
+            around.append((index - cols, DOWN))
+        if col > 0:
+            around.append((index - 1, RIGHT))
+        if col < cols - 1:
+            around.append((index + 1, LEFT))
+        if row < self.rows - 1:
+            around.append((index + cols, UP))
+
+        for neighbor, bit in around:
+            if opened:
+                masks[neighbor] |= bit
+            else:
+                masks[neighbor] &= ~bit
 
     def get_neighbors(self, node: Node):
         """Returns the neighbors of the specified Node."""
@@ -45,22 +277,34 @@ class Graph:
 
         # top
         if self.__in_grid((row - 1, col)):
-            neighbors.append(self._grid[row - 1][col])
+            neighbors.append(Node(row - 1, col, self))
 
         # left
         if self.__in_grid((row, col - 1)):
-            neighbors.append(self._grid[row][col - 1])
+            neighbors.append(Node(row, col - 1, self))
 
         # right
         if self.__in_grid((row, col + 1)):
-            neighbors.append(self._grid[row][col + 1])
+            neighbors.append(Node(row, col + 1, self))
 
         # bottom
         if self.__in_grid((row + 1, col)):
-            neighbors.append(self._grid[row + 1][col])
+            neighbors.append(Node(row + 1, col, self))
 
         return neighbors
 
+    def get_open_neighbors(self, node: Node):
+        """
+        Returns the neighbors of the specified Node that are not walls, read
+        from the neighbor index.
+        """
+
+        cols = self.collumns
+        index = node.row * cols + node.col
+
+        return [Node(*divmod(index + step, cols), self)
+                for step in self._steps[self._open[index]]]
+
     def __in_grid(self, coordinate):
         """
         Returns if the specified coordinate (row, col) is in this graph's
@@ -76,11 +320,11 @@ class Graph:
         if not self.__in_grid(new_start):
             return
 
-        old_row, old_col = self.start
-        row, col = new_start
+        old_index = self._index(self.start)
         self.start = new_start
-        self._grid[old_row][old_col].update_type(NodeType.EMPTY)
-        self._grid[row][col].update_type(NodeType.START)
+        self._set(old_index, EMPTY)
+        self._set(self._index(new_start), START)
+        self._notify(START_MOVED, self._index(new_start))
 
     def update_end(self, new_end):
         """Makes the Node at the specified (row, col) as the end Node."""
@@ -88,11 +332,11 @@ class Graph:
         if not self.__in_grid(new_end):
             return
 
-        old_row, old_col = self.end
-        row, col = new_end
+        old_index = self._index(self.end)
         self.end = new_end
-        self._grid[old_row][old_col].update_type(NodeType.EMPTY)
-        self._grid[row][col].update_type(NodeType.END)
+        self._set(old_index, EMPTY)
+        self._set(self._index(new_end), END)
+        self._notify(END_MOVED, self._index(new_end))
 
     def make_wall(self, coordinate):
         """Makes the Node at the specified (row, col) as a wall Node."""
@@ -100,12 +344,12 @@ class Graph:
         if not self.__in_grid(coordinate):
             return
 
-        node = self.get(coordinate)
-        
-        if node.is_start() or node.is_end():
+        index = self._index(coordinate)
+
+        if self._cells[index] in (START, END):
             return
 
-        node.update_type(NodeType.WALL)
+        self._set(index, WALL)
 
     def make_empty(self, coordinate):
         """Makes the Node at the specified (row, col) as an empty Node."""
@@ -113,12 +357,12 @@ class Graph:
         if not self.__in_grid(coordinate):
             return
 
-        node = self.get(coordinate)
+        index = self._index(coordinate)
 
-        if node.is_start() or node.is_end():
+        if self._cells[index] in (START, END):
             return
 
-        node.update_type(NodeType.EMPTY)
+        self._set(index, EMPTY)
 
     def is_wall(self, coordinate):
         """Returns if the Node at the specified (row, col) is a wall."""
@@ -126,9 +370,7 @@ class Graph:
         if not self.__in_grid(coordinate):
             return False
 
-        node = self.get(coordinate)
-
-        return node.is_wall()
+        return self._cells[self._index(coordinate)] == WALL
 
     def is_empty(self, coordinate):
         """Returns if the Node at the specified (row, col) is empty."""
@@ -136,9 +378,7 @@ class Graph:
         if not self.__in_grid(coordinate):
             return False
 
-        node = self.get(coordinate)
-
-        return node.is_empty()
+        return self._cells[self._index(coordinate)] == EMPTY
 
     def is_start(self, coordinate):
         """Returns if the Node at the specified (row, col) is a start Node."""
@@ -159,14 +399,118 @@ class Graph:
         if not self.__in_grid(coordinate):
             return
 
-        node = self.get(coordinate)
+        code = self._cells[self._index(coordinate)]
 
-        if node.is_empty() or node.is_path() or node.is_visited():
+        if code in (EMPTY, PATH, VISITED):
             self.make_wall(coordinate)
 
         elif self.is_wall(coordinate):
             self.make_empty(coordinate)
 
+    def set_cost(self, coordinate, cost):
+        """
+        Sets the cost of entering the Node at the specified (row, col), an
+        integer from 1 to MAX_COST.
+        """
+
+        if not 1 <= cost <= MAX_COST:
+            raise ValueError(f"cost must be between 1 and {MAX_COST}, "
+                             f"got {cost}")
+
+        if not self.__in_grid(coordinate):
+            return
+
+        index = self._index(coordinate)
+        costs = self._costs
+        old_cost = costs[index]
+
+        if old_cost == cost:
+            return
+
+        costs[index] = cost
+        self._weighted_count += ((cost != DEFAULT_COST)
+                                 - (old_cost != DEFAULT_COST))
+        self._cost_counts[old_cost] -= 1
+        self._cost_counts[cost] += 1
+        self.version += 1
+
+        if self._listeners:
+            self._notify(COST_CHANGED, index)
+
+    def get_cost(self, coordinate):
+        """Returns the cost of entering the Node at (row, col)."""
+
+        return self._costs[self._index(coordinate)]
+
+    def get_costs(self):
+        """
+        Returns the cost layer, one byte per cell in row-major order.
+
+        The bytearray is the Graph's own, solvers read it directly and callers
+        must change costs through set_cost().
+        """
+
+        return self._costs
+
+    def load_costs(self, costs):
+        """
+        Replaces every cost by the specified costs, a bytes-like object with
+        one cost from 1 to MAX_COST per cell in row-major order.
+        """
+
+        if len(costs) != len(self._costs):
+            raise ValueError(
+                f"expected {len(self._costs)} cells, got {len(costs)}"
+            )
+
+        if 0 in costs:
+            raise ValueError(f"cost must be between 1 and {MAX_COST}, got 0")
+
+        self._costs[:] = costs
+        self._weighted_count = (len(costs)
+                                - self._costs.count(DEFAULT_COST))
+        self._cost_counts = [0] * (MAX_COST + 1)
+        for cost, count in Counter(self._costs).items():
+            self._cost_counts[cost] = count
+        self.version += 1
+
+        self._notify(RESET, None)
+
+    def is_weighted(self):
+        """Returns if any cell costs something else than DEFAULT_COST."""
+
+        return self._weighted_count != 0
+
+    def get_min_cost(self):
+        """
+        Returns the smallest cost of entering any cell, looked up in the count
+        of cells of every cost rather than over the grid.
+        """
+
+        if not self._weighted_count:
+            return DEFAULT_COST
+
+        counts = self._cost_counts
+        cost = 1
+        while not counts[cost]:
+            cost += 1
+        return cost
+
+    def get_max_cost(self):
+        """
+        Returns the largest cost of entering any cell, looked up in the count
+        of cells of every cost rather than over the grid.
+        """
+
+        if not self._weighted_count:
+            return DEFAULT_COST
+
+        counts = self._cost_counts
+        cost = MAX_COST
+        while not counts[cost]:
+            cost -= 1
+        return cost
+
     def get_start_node(self):
         """Gets the start Node of this Graph."""
 
@@ -184,69 +528,114 @@ class Graph:
             return
         
         row, col = coordinate
-        return self._grid[row][col]
+        return Node(row, col, self)
 
     def get_grid(self):
-        """Returns the grid of this graph."""
+        """
+        Returns the grid of this graph as a 2d list of Nodes.
+
+        The Nodes are created on every call, prefer get() for single cells.
+        """
 
-        return self._grid
+        return [[Node(row, col, self) for col in range(self.collumns)]
+                for row in range(self.rows)]
 
     def clear_path(self):
         """
         Resets the boards by making all visited Node and path Node into empty 
         node.
+
+        Only the cells marked since the last call are visited, so the cost is
+        proportional to the size of the previous search.
         """
 
-        for row in self._grid:
-            for node in row:
-                if node.is_path() or node.is_visited():
-                    node.update_type(NodeType.EMPTY)
+        cells = self._cells
+
+        for index in self._touched:
+            code = cells[index]
+            if code == PATH or code == VISITED:
+                cells[index] = EMPTY
+
+        self._touched = []
+
+    def get_walls(self):
+        """
+        Returns the walls of this Graph as bytes, one per cell in row-major
+        order, 1 for a wall and 0 otherwise.
+        """
+
+        return bytes(self._cells).translate(_WALLS)
+
+    def load_walls(self, walls):
+        """
+        Replaces every cell by the specified walls, a bytes-like object with
+        one byte per cell in row-major order where any non zero byte is a
+        wall. Marks are dropped and the start and end are kept (never walls).
+        """
+
+        cells = self._cells
+
+        if len(walls) != len(cells):
+            raise ValueError(
+                f"expected {len(cells)} cells, got {len(walls)}"
+            )
+
+        cells[:] = bytes(walls).translate(_WALL_CODES)
+        cells[self._index(self.start)] = START
+        cells[self._index(self.end)] = END
+
+        self._touched = []
+        self._wall_count = cells.count(WALL)
+        self.version += 1
+        self._build_index()
+
+        self._notify(RESET, None)
 
     def clear(self):
         """
         Resets the boards by making all nodes empty and set the start Node at
-        top left corner and end Node at bottom right corner.
+        top left corner and end Node at bottom right corner. Every cost goes
+        back to DEFAULT_COST.
         """
 
+        self.clear_path()
+
+        cells = self._cells
+
+        if self._weighted_count:
+            self._costs[:] = bytearray([DEFAULT_COST]) * len(cells)
+            self._weighted_count = 0
+            self._cost_counts = [0] * (MAX_COST + 1)
+            self._cost_counts[DEFAULT_COST] = len(cells)
+            self.version += 1
+
+        if self._wall_count:
+            # Walls can be anywhere, reset the whole array at C speed
+            cells[:] = bytes(len(cells))
+            self._wall_count = 0
+            self.version += 1
+            self._build_index()
+        else:
+            cells[self._index(self.start)] = EMPTY
+            cells[self._index(self.end)] = EMPTY
+
         self.start = (0, 0)
         self.end = (self.rows - 1, self.collumns - 1)
 
-        for row in self._grid:
-            for node in row:
-                node.update_type(NodeType.EMPTY)
+        cells[self._index(self.start)] = START
+        cells[self._index(self.end)] = END
 
-        self._grid[0][0].update_type(NodeType.START)
-        self._grid[self.end[0]][self.end[1]].update_type(NodeType.END)
+        self._notify(RESET, None)
 
     def draw(self, window):
-        """Draws this Graph on the specified window."""
-
-        self.__draw_nodes(window)
-        self.__draw_line(window)
-        pygame.display.update()
-
-    def __draw_line(self, window):
-        """Draws the border between each node on the specified window."""
-
-        # top of the Graph
-        top = PADDING
-        # bottom of the Graph
-        bottom = NODE_SIZE * self.rows + PADDING
-        # left side of the Graph
-        left = PADDING
-        # right side of the Graph
-        right = NODE_SIZE * self.collumns + PADDING
-
-        for i in range(self.rows + 1):
-            y = i * NODE_SIZE + PADDING
-            pygame.draw.line(window, BORDER, (left, y), (right, y))
-            for j in range(self.collumns + 1):
-                x = j * NODE_SIZE + PADDING
-                pygame.draw.line(window, BORDER, (x, top), (x, bottom))
-
-    def __draw_nodes(self, window):
-        """Draws the nodes of this graph on the specified window."""
-
-        for row in self._grid:
-            for node in row:
-                node.draw(window)
+        """
+        Draws this Graph on the specified window, only repainting the cells
+        that changed since the previous call.
+
+        Rendering lives in the renderer module, which is only imported here so
+        that the Graph itself can be used without pygame.
+        """
+
+        from renderer import draw_graph
+
+        draw_graph(self, window)
@@ -0,0 +1,312 @@
+"""
+Grids stored on disk, for mazes too large to be built as a Graph first.
+
+A grid file is a header followed by planes of one value per cell:
+
+- the header holds the format version, the flags of the optional planes, the
+  size of the grid and its start and end;
+- the wall plane, one bit per cell, set for a wall. Every row starts on a
+  byte boundary, with the most significant bit first, so a row can be read
+  or written on its own;
+- the cost plane when COSTS is set, one byte per cell as Graph.get_costs;
+- the visited plane when VISITED is set, laid out like the wall plane, set
+  for the cells a search visited or put on its path.
+
+Files are written from an iterable of rows, such as maze.eller_rows, so a
+grid is never held in memory as a whole while it is written. They are read
+through mmap: opening a GridFile costs nothing whatever its size, the planes
+are read straight from the page cache and every process mapping the same
+file shares those pages. Bits are packed and unpacked a row at a time with
+big integer conversions, which run at C speed.
+"""
+import mmap
+import struct
+from graph import Graph, DEFAULT_COST
+from node_type import EMPTY, VISITED, PATH
+
+MAGIC = b"MAZE"
+FORMAT_VERSION = 2
+
+# Flags of the optional planes
+COSTS = 1
+VISITED_CELLS = 2
+
+# magic, format version, flags, rows, collumns, start row, start col, end
+# row, end col
+_HEADER = struct.Struct("<4sHHIIIIII")
+
+# Cells as in Graph.get_walls to the ASCII digits int() parses, and back
+_TO_DIGITS = bytes(0x31 if byte else 0x30 for byte in range(256))
+_FROM_DIGITS = bytes(1 if byte == 0x31 else 0 for byte in range(256))
+
+# Cell codes to 1 for the cells marked by a search
+_MARKED = bytes(1 if code in (VISITED, PATH) else 0 for code in range(256))
+
+
+def _stride(collumns):
+    """Returns the bytes taken by one row of a bit plane."""
+
+    return (collumns + 7) // 8
+
+
+def pack_row(line, collumns):
+    """Returns the row of cells line, one byte each, packed into bits."""
+
+    stride = _stride(collumns)
+    bits = int(bytes(line).translate(_TO_DIGITS) or b"0", 2)
+
+    return (bits << (stride * 8 - collumns)).to_bytes(stride, "big")
+
+
+def unpack_row(packed, collumns):
+    """Returns the bits of packed as collumns cells of one byte each."""
+
+    size = len(packed) * 8
+    digits = format(int.from_bytes(packed, "big"), f"0{size}b")
+
+    return digits.encode("ascii")[:collumns].translate(_FROM_DIGITS)
+
+
+def _pack_plane(cells, rows, collumns):
+    """Yields the packed rows of cells, one byte per cell."""
+
+    for row in range(rows):
+        yield pack_row(cells[row * collumns:(row + 1) * collumns], collumns)
+
+
+def write_grid(path, rows, collumns, lines, start=(0, 0), end=None,
+               costs=None, visited=None):
+    """
+    Writes a grid file of rows by collumns cells to path from lines, an
+    iterable of rows of walls as bytes-like objects of collumns bytes with
+    any non zero byte being a wall. The end defaults to the bottom right
+    corner.
+
+    costs, one byte per cell, and visited, one byte per cell non zero for a
+    visited cell, are written as the optional planes when given.
+    """
+
+    if end is None:
+        end = (rows - 1, collumns - 1)
+
+    flags = (COSTS if costs is not None else 0) | (
+        VISITED_CELLS if visited is not None else 0)
+
+    if costs is not None and len(costs) != rows * collumns:
+        raise ValueError(f"expected {rows * collumns} costs, got {len(costs)}")
+
+    with open(path, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, flags, rows, collumns,
+                                *start, *end))
+        written = 0
+
+        for line in lines:
+            if len(line) != collumns:
+                raise ValueError(
+                    f"expected rows of {collumns} cells, got {len(line)}"
+                )
+
+            file.write(pack_row(line, collumns))
+            written += 1
+
+        if written != rows:
+            raise ValueError(f"expected {rows} rows, got {written}")
+
+        if costs is not None:
+            file.write(costs)
+
+        if visited is not None:
+            file.writelines(_pack_plane(visited, rows, collumns))
+
+
+def save_graph(graph, path, visited=False):
+    """
+    Writes graph to a grid file at path. The cost plane is only written for
+    a weighted graph, the visited plane when visited is set.
+    """
+
+    rows, collumns = graph.rows, graph.collumns
+    walls = graph.get_walls()
+
+    write_grid(path, rows, collumns,
+               (walls[row * collumns:(row + 1) * collumns]
+                for row in range(rows)),
+               graph.start, graph.end,
+               costs=graph.get_costs() if graph.is_weighted() else None,
+               visited=(bytes(graph._cells).translate(_MARKED)
+                        if visited else None))
+
+
+class GridFile:
+    """
+    A grid file mapped in memory, read only.
+
+    Nothing is read when it is opened, walls are tested in the mapped pages
+    directly, so a process can query a grid larger than its memory and
+    processes opening the same file share a single copy of it.
+    """
+
+    def __init__(self, path):
+        """Maps the grid file at path."""
+
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._read_header()
+        except ValueError:
+            self._map.close()
+            raise
+
+    def _read_header(self):
+        """Reads and checks the header and the size of the file."""
+
+        if len(self._map) < _HEADER.size:
+            raise ValueError("not a grid file: header too short")
+
+        (magic, version, flags, rows, collumns, start_row, start_col,
+         end_row, end_col) = _HEADER.unpack_from(self._map)
+
+        if magic != MAGIC:
+            raise ValueError("not a grid file: bad magic")
+
+        if version != FORMAT_VERSION:
+            raise ValueError(f"unsupported grid file version {version}")
+
+        self.rows = rows
+        self.collumns = collumns
+        self.start = (start_row, start_col)
+        self.end = (end_row, end_col)
+        self.stride = _stride(collumns)
+
+        plane = rows * self.stride
+        self._walls = _HEADER.size
+        self._costs = self._walls + plane if flags & COSTS else None
+        self._visited = None
+        size = self._walls + plane
+
+        if flags & COSTS:
+            size += rows * collumns
+
+        if flags & VISITED_CELLS:
+            self._visited = size
+            size += plane
+
+        if len(self._map) != size:
+            raise ValueError(
+                f"grid file truncated: expected {size} bytes, "
+                f"got {len(self._map)}"
+            )
+
+    def close(self):
+        """Unmaps the file."""
+
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def has_costs(self):
+        """Returns if the file holds a cost plane."""
+
+        return self._costs is not None
+
+    def has_visited(self):
+        """Returns if the file holds a visited plane."""
+
+        return self._visited is not None
+
+    def is_wall(self, coordinate):
+        """Returns if the cell at (row, col) is a wall."""
+
+        row, col = coordinate
+        byte = self._map[self._walls + row * self.stride + col // 8]
+
+        return bool(byte & (0x80 >> (col % 8)))
+
+    def wall_row(self, row):
+        """Returns the walls of row as bytes, 1 for a wall."""
+
+        offset = self._walls + row * self.stride
+
+        return unpack_row(self._map[offset:offset + self.stride],
+                          self.collumns)
+
+    def walls(self):
+        """Returns every wall as bytes in the format of Graph.load_walls."""
+
+        return b"".join(self.wall_row(row) for row in range(self.rows))
+
+    def costs(self):
+        """Returns the cost plane as bytes, or None without one."""
+
+        if self._costs is None:
+            return None
+
+        return self._map[self._costs:self._costs + self.rows * self.collumns]
+
+    def visited(self):
+        """
+        Returns the visited plane as bytes, 1 for a visited cell, or None
+        without one.
+        """
+
+        if self._visited is None:
+            return None
+
+        stride = self.stride
+        offset = self._visited
+
+        return b"".join(
+            unpack_row(self._map[offset + row * stride:
+                                 offset + (row + 1) * stride], self.collumns)
+            for row in range(self.rows)
+        )
+
+    def to_graph(self):
+        """
+        Returns a Graph with the content of the file, the cells of the
+        visited plane marked VISITED.
+        """
+
+        graph = Graph(self.rows, self.collumns, self.start, self.end)
+        graph.load_walls(self.walls())
+
+        costs = self.costs()
+
+        if costs is not None and costs.count(DEFAULT_COST) != len(costs):
+            graph.load_costs(costs)
+
+        visited = self.visited()
+
+        if visited is not None:
+            cells = graph._cells
+            touched = graph._touched
+            index = visited.find(1)
+
+            while index != -1:
+                if cells[index] == EMPTY:
+                    cells[index] = VISITED
+                    touched.append(index)
+
+                index = visited.find(1, index + 1)
+
+        return graph
+
+
+def read_rows(path):
+    """Yields the rows of walls of the grid file at path one at a time."""
+
+    with GridFile(path) as grid:
+        for row in range(grid.rows):
+            yield grid.wall_row(row)
+
+
+def load_graph(path):
+    """Returns a Graph with the content of the grid file at path."""
+
+    with GridFile(path) as grid:
+        return grid.to_graph()
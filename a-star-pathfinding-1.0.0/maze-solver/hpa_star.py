@@ -0,0 +1,529 @@
+"""
+Hierarchical path finding (HPA*, Botea, Mueller and Schaeffer).
+
+The grid is cut into square clusters. Along the border between two clusters
+every run of cell pairs passable on both sides gets one transition in its
+middle, or two at its ends when the run is long. The cells of the transitions
+are the nodes of an abstract graph:
+
+- inter edges join the two cells of a transition, one step across the border,
+- intra edges join the nodes of one cluster, weighted by the cost of the
+  cheapest path between them that stays inside the cluster.
+
+A query links the start and the end to the nodes of their clusters, runs A* on
+the abstract graph and only then refines the abstract path into cells, one
+intra cluster segment at a time. Refined segments are cached with the cluster.
+
+The hierarchy subscribes to its Graph: a wall or cost edit marks the cluster
+of the cell dirty, and the cluster across the border when the cell lies on
+one. Dirty clusters are rebuilt by the next query, the others are kept.
+
+Paths are usually close to the shortest but are not guaranteed to be: they
+go through the transition cells, and a path inside one cluster never leaves it.
+"""
+import weakref
+from heapq import heappush, heappop
+from graph import WALL_ADDED, WALL_REMOVED, RESET, COST_CHANGED
+from node import Node
+from node_type import NodeType, EMPTY, VISITED, WALL
+
+FAILURE = []
+
+INFINITY = float("inf")
+
+CLUSTER_SIZE = 10
+
+# Runs of open border cells at least this long get a transition at each end
+# instead of one in the middle
+LONG_RUN = 6
+
+# How an abstract edge is refined into cells
+INTER = 0
+INTRA = 1
+FROM_START = 2
+TO_GOAL = 3
+
+# One hierarchy per Graph, reused by every hpa_star call
+_hierarchies = weakref.WeakKeyDictionary()
+
+
+def hpa_star(graph, start_node, end_node, draw=None,
+             cluster_size=CLUSTER_SIZE):
+    """
+    Finds a path from start_node to end_node through the Graph's Hierarchy
+    and returns the Nodes in between, or FAILURE if there is none.
+
+    The abstract nodes expanded by the search are marked as visited.
+    """
+
+    hierarchy = _hierarchies.get(graph)
+
+    if hierarchy is None or hierarchy.cluster_size != cluster_size:
+        if hierarchy is not None:
+            hierarchy.close()
+
+        hierarchy = Hierarchy(graph, cluster_size)
+        _hierarchies[graph] = hierarchy
+
+    graph.clear_path()
+
+    cols = graph.collumns
+    start = start_node.row * cols + start_node.col
+    goal = end_node.row * cols + end_node.col
+
+    if graph.is_separated(start, goal):
+        return FAILURE
+
+    legs = hierarchy.abstract_path(start, goal, draw)
+
+    if legs is None:
+        return FAILURE
+
+    nodes = []
+
+    for index in hierarchy.refine(legs):
+        if index == goal:
+            break
+
+        node = Node(*divmod(index, cols), graph)
+        node.update_type(NodeType.PATH)
+        nodes.append(node)
+
+        if draw is not None:
+            draw()
+
+    return nodes
+
+
+class Hierarchy:
+    """
+    Abstract graph of a Graph cut into clusters of cluster_size squared cells.
+
+    Clusters are numbered row-major, a border is the (a, b) pair of clusters
+    it separates with a above or left of b. Abstract nodes are flat cell
+    indices like everywhere else.
+    """
+
+    def __init__(self, graph, cluster_size=CLUSTER_SIZE):
+        """Constructs the hierarchy of graph, built on the first query."""
+
+        self.graph = graph
+        self.cluster_size = cluster_size
+        self.cols = graph.collumns
+        self.cluster_rows = -(-graph.rows // cluster_size)
+        self.cluster_cols = -(-graph.collumns // cluster_size)
+
+        # border -> [(cell in a, cell in b)]
+        self._transitions = {}
+        # cell -> {cell across a border: cost of entering it}
+        self._inter = {}
+        # cluster -> set of its abstract nodes
+        self._entrances = {}
+        # cluster -> {node: {node of the same cluster: cost}}
+        self._intra = {}
+        # cluster -> {(node, node): refined cells}
+        self._segments = {}
+
+        self._changed = set()
+        self._stale = True
+        graph.subscribe(self._on_change)
+
+    def close(self):
+        """Stops listening to the Graph."""
+
+        self.graph.unsubscribe(self._on_change)
+
+    def _on_change(self, kind, index):
+        """Graph listener, records the cells to rebuild around."""
+
+        if kind == WALL_ADDED or kind == WALL_REMOVED or kind == COST_CHANGED:
+            self._changed.add(index)
+        elif kind == RESET:
+            self._stale = True
+
+    def cluster_of(self, index):
+        """Returns the cluster holding the cell at index."""
+
+        row, col = divmod(index, self.cols)
+        size = self.cluster_size
+        return row // size * self.cluster_cols + col // size
+
+    def _bounds(self, cluster):
+        """Returns the (top, bottom, left, right) cell bounds of cluster."""
+
+        size = self.cluster_size
+        cluster_row, cluster_col = divmod(cluster, self.cluster_cols)
+        top, left = cluster_row * size, cluster_col * size
+        return (top, min(top + size, self.graph.rows),
+                left, min(left + size, self.cols))
+
+    def _borders_of_cluster(self, cluster):
+        """Returns the borders around cluster."""
+
+        cluster_row, cluster_col = divmod(cluster, self.cluster_cols)
+        borders = []
+
+        if cluster_row > 0:
+            borders.append((cluster - self.cluster_cols, cluster))
+        if cluster_col > 0:
+            borders.append((cluster - 1, cluster))
+        if cluster_col < self.cluster_cols - 1:
+            borders.append((cluster, cluster + 1))
+        if cluster_row < self.cluster_rows - 1:
+            borders.append((cluster, cluster + self.cluster_cols))
+
+        return borders
+
+    def _borders_of_cell(self, index):
+        """Returns the borders the cell at index lies on."""
+
+        row, col = divmod(index, self.cols)
+        size = self.cluster_size
+        cluster = self.cluster_of(index)
+        borders = []
+
+        if row % size == 0 and row > 0:
+            borders.append((cluster - self.cluster_cols, cluster))
+        if col % size == 0 and col > 0:
+            borders.append((cluster - 1, cluster))
+        if col % size == size - 1 and col < self.cols - 1:
+            borders.append((cluster, cluster + 1))
+        if row % size == size - 1 and row < self.graph.rows - 1:
+            borders.append((cluster, cluster + self.cluster_cols))
+
+        return borders
+
+    def _scan_border(self, border):
+        """Replaces the transitions across border."""
+
+        inter = self._inter
+
+        for pair in self._transitions.pop(border, ()):
+            for a, b in (pair, pair[::-1]):
+                del inter[a][b]
+
+                if not inter[a]:
+                    del inter[a]
+
+        a, b = border
+        cols = self.cols
+        top, bottom, left, right = self._bounds(a)
+
+        # With a single column of clusters stacked clusters are a + 1 apart
+        # as well, only the cluster rows tell the two apart
+        if a // self.cluster_cols == b // self.cluster_cols:
+            # Side by side, pair the right column of a with the left of b
+            pairs = [(row * cols + right - 1, row * cols + right)
+                     for row in range(top, bottom)]
+        else:
+            # Stacked, pair the bottom row of a with the top of b
+            pairs = [((bottom - 1) * cols + col, bottom * cols + col)
+                     for col in range(left, right)]
+
+        cells = self.graph._cells
+        costs = self.graph.get_costs()
+        transitions = []
+        run = []
+
+        # The sentinel closes the last run
+        for pair in pairs + [None]:
+            if (pair is not None and cells[pair[0]] != WALL
+                    and cells[pair[1]] != WALL):
+                run.append(pair)
+                continue
+
+            if len(run) >= LONG_RUN:
+                transitions += (run[0], run[-1])
+            elif run:
+                transitions.append(run[len(run) // 2])
+
+            run = []
+
+        for a, b in transitions:
+            inter.setdefault(a, {})[b] = costs[b]
+            inter.setdefault(b, {})[a] = costs[a]
+
+        self._transitions[border] = transitions
+
+    def _build_cluster(self, cluster):
+        """Recomputes the abstract nodes and intra edges of cluster."""
+
+        entrances = set()
+
+        for border in self._borders_of_cluster(cluster):
+            side = 0 if border[0] == cluster else 1
+
+            for pair in self._transitions.get(border, ()):
+                entrances.add(pair[side])
+
+        intra = {}
+
+        for entrance in entrances:
+            targets = entrances - {entrance}
+            dist, _ = self._search_cluster(entrance, cluster, targets)
+            intra[entrance] = {target: dist[target] for target in targets
+                               if target in dist}
+
+        self._entrances[cluster] = entrances
+        self._intra[cluster] = intra
+        self._segments[cluster] = {}
+
+    def _build(self):
+        """Builds every border and cluster from scratch."""
+
+        self._transitions.clear()
+        self._inter.clear()
+
+        for cluster in range(self.cluster_rows * self.cluster_cols):
+            for border in self._borders_of_cluster(cluster):
+                if border[0] == cluster:
+                    self._scan_border(border)
+
+        for cluster in range(self.cluster_rows * self.cluster_cols):
+            self._build_cluster(cluster)
+
+        self._changed.clear()
+        self._stale = False
+
+    def refresh(self):
+        """Rebuilds the clusters touched since the last refresh."""
+
+        if self._stale:
+            self._build()
+            return
+
+        if not self._changed:
+            return
+
+        borders = set()
+        clusters = set()
+
+        for index in self._changed:
+            clusters.add(self.cluster_of(index))
+
+            for border in self._borders_of_cell(index):
+                borders.add(border)
+                clusters.update(border)
+
+        self._changed.clear()
+
+        for border in borders:
+            self._scan_border(border)
+
+        for cluster in clusters:
+            self._build_cluster(cluster)
+
+    def _search_cluster(self, source, cluster, targets=None):
+        """
+        Runs Dijkstra from source without leaving cluster, until every one of
+        targets is settled when specified. Returns the (dist, parent) dicts.
+        """
+
+        top, bottom, left, right = self._bounds(cluster)
+        cols = self.cols
+        costs = self.graph.get_costs()
+        masks, steps = self.graph.get_neighbor_index()
+
+        dist = {source: 0}
+        parent = {}
+        open_set = [(0, source)]
+        remaining = len(targets) if targets is not None else -1
+
+        while open_set and remaining:
+            score, current = heappop(open_set)
+
+            if score > dist[current]:
+                continue
+
+            if targets is not None and current in targets:
+                remaining -= 1
+
+            for step in steps[masks[current]]:
+                neighbor = current + step
+                row, col = divmod(neighbor, cols)
+
+                if not (top <= row < bottom and left <= col < right):
+                    continue
+
+                tentative_score = score + costs[neighbor]
+
+                if tentative_score < dist.get(neighbor, INFINITY):
+                    dist[neighbor] = tentative_score
+                    parent[neighbor] = current
+                    heappush(open_set, (tentative_score, neighbor))
+
+        return dist, parent
+
+    def abstract_path(self, start, goal, draw=None):
+        """
+        Runs A* on the abstract graph from start to goal and returns the path
+        as a list of (from, to, kind, tree) legs, or None when there is none.
+        tree is the search tree a FROM_START or TO_GOAL leg is refined with.
+        """
+
+        self.refresh()
+
+        graph = self.graph
+        cells = graph._cells
+        touched = graph._touched
+        costs = graph.get_costs()
+        cols = self.cols
+
+        start_cluster = self.cluster_of(start)
+        goal_cluster = self.cluster_of(goal)
+
+        # Links from the start to the nodes of its cluster, and to the goal
+        # when it is in the same cluster
+        start_dist, start_tree = self._search_cluster(start, start_cluster)
+        start_links = [(node, start_dist[node])
+                       for node in self._entrances[start_cluster]
+                       if node in start_dist and node != start]
+
+        if goal in start_dist:
+            start_links.append((goal, start_dist[goal]))
+
+        # Links from the nodes of the goal's cluster to the goal. The search
+        # runs from the goal, reversing a path swaps which end is paid for
+        goal_dist, goal_tree = self._search_cluster(goal, goal_cluster)
+        goal_links = {node: goal_dist[node] - costs[node] + costs[goal]
+                      for node in self._entrances[goal_cluster]
+                      if node in goal_dist and node != goal}
+
+        goal_row, goal_col = divmod(goal, cols)
+        scale = graph.get_min_cost()
+
+        def h(index):
+            row, col = divmod(index, cols)
+            return scale * (abs(goal_row - row) + abs(goal_col - col))
+
+        g_score = {start: 0}
+        came_from = {}
+        closed = set()
+        open_set = [(h(start), 0, 0, start)]
+        counter = 1
+
+        while open_set:
+            current = heappop(open_set)[3]
+
+            if current in closed:
+                continue
+
+            closed.add(current)
+
+            if cells[current] == EMPTY:
+                cells[current] = VISITED
+                touched.append(current)
+
+            if draw is not None:
+                draw()
+
+            if current == goal:
+                return self._legs(came_from, start, goal, start_tree,
+                                  goal_tree)
+
+            successors = []
+            cluster = self.cluster_of(current)
+
+            for node, cost in self._intra[cluster].get(current, {}).items():
+                successors.append((node, cost, INTRA))
+
+            for node, cost in self._inter.get(current, {}).items():
+                successors.append((node, cost, INTER))
+
+            if current == start:
+                for node, cost in start_links:
+                    successors.append((node, cost, FROM_START))
+
+            if current in goal_links:
+                successors.append((goal, goal_links[current], TO_GOAL))
+
+            for node, cost, kind in successors:
+                tentative_g_score = g_score[current] + cost
+
+                if tentative_g_score < g_score.get(node, INFINITY):
+                    g_score[node] = tentative_g_score
+                    came_from[node] = (current, kind)
+
+                    heappush(open_set, (tentative_g_score + h(node),
+                                        -tentative_g_score, counter, node))
+                    counter += 1
+
+        return None
+
+    def _legs(self, came_from, start, goal, start_tree, goal_tree):
+        """Lists the legs of the abstract path ending at goal."""
+
+        legs = []
+        current = goal
+
+        while current != start:
+            previous, kind = came_from[current]
+
+            if kind == FROM_START:
+                tree = start_tree
+            elif kind == TO_GOAL:
+                tree = goal_tree
+            else:
+                tree = None
+
+            legs.append((previous, current, kind, tree))
+            current = previous
+
+        legs.reverse()
+        return legs
+
+    def refine(self, legs):
+        """
+        Yields the cells of the abstract path legs, after the start up to the
+        goal included, refining each leg only when it is reached.
+        """
+
+        for source, target, kind, tree in legs:
+            if kind == INTER:
+                yield target
+
+            elif kind == INTRA:
+                yield from self._segment(source, target)
+
+            elif kind == FROM_START:
+                # tree is rooted at the start, walk back from the target
+                cells = []
+                current = target
+
+                while current != source:
+                    cells.append(current)
+                    current = tree[current]
+
+                yield from reversed(cells)
+
+            else:
+                # tree is rooted at the goal, its parents lead to it
+                current = source
+
+                while current != target:
+                    current = tree[current]
+                    yield current
+
+    def _segment(self, source, target):
+        """
+        Returns the cells after source up to target on the cheapest path
+        inside their cluster, cached until the cluster is rebuilt.
+        """
+
+        cluster = self.cluster_of(source)
+        segments = self._segments[cluster]
+        cells = segments.get((source, target))
+
+        if cells is None:
+            _, parent = self._search_cluster(source, cluster, {target})
+            path = []
+            current = target
+
+            while current != source:
+                path.append(current)
+                current = parent[current]
+
+            path.reverse()
+            cells = segments[(source, target)] = tuple(path)
+
+        return cells
@@ -0,0 +1,350 @@
+"""
+Jump Point Search for 4-connected grids where every step costs 1.
+
+Instead of pushing every neighbor, the search jumps in straight lines and only
+stops on cells where the shortest path may turn (jump points): cells with a
+forced neighbor, cells from which a horizontal scan finds a jump point, and
+the end. Only jump points enter the open list.
+
+With plus=True the jump distances of every cell in every direction are
+precomputed (JPS+) and cached on the Graph until the walls change, so each
+jump is a table lookup instead of a scan.
+
+Jumps skip the cells they cross, so on a weighted Graph the path is found by
+dijkstra instead.
+"""
+import weakref
+from array import array
+from heapq import heappush, heappop
+from node import Node
+from node_type import NodeType, EMPTY, VISITED, WALL
+from dijkstra import dijkstra
+
+FAILURE = []
+
+# Cached JPS+ tables by Graph, together with the wall version they describe
+_tables = weakref.WeakKeyDictionary()
+
+
+def jps(graph, start_node, end_node, draw=None, plus=False):
+    """
+    Finds a shortest path from start_node to end_node with Jump Point Search
+    and returns the Nodes in between, or FAILURE if there is none.
+    """
+
+    if graph.is_weighted():
+        return dijkstra(graph, start_node, end_node, draw)
+
+    graph.clear_path()
+
+    rows, cols = graph.rows, graph.collumns
+    cells = graph._cells
+    touched = graph._touched
+
+    start = start_node.row * cols + start_node.col
+    end = end_node.row * cols + end_node.col
+    end_row, end_col = end_node.row, end_node.col
+
+    # There are no cells in between when the start is the end
+    if start == end or graph.is_separated(start, end):
+        return FAILURE
+
+    if plus:
+        jump = _plus_jumper(graph, end)
+    else:
+        def jump(row, col, d_row, d_col):
+            if d_row:
+                return _jump_vertical(cells, rows, cols, row + d_row, col,
+                                      d_row, end)
+            return _jump_horizontal(cells, rows, cols, row, col + d_col,
+                                    d_col, end)
+
+    g_score = {start: 0}
+    came_from = {}
+    closed = set()
+
+    open_set = [(abs(end_row - start_node.row) + abs(end_col - start_node.col),
+                 0, 0, start)]
+    counter = 1
+
+    while open_set:
+        current = heappop(open_set)[3]
+
+        if current in closed:
+            continue
+
+        closed.add(current)
+
+        if cells[current] == EMPTY:
+            cells[current] = VISITED
+            touched.append(current)
+
+        if draw is not None:
+            draw()
+
+        if current == end:
+            return reconstruct_path(graph, came_from, start, end, draw)
+
+        row, col = divmod(current, cols)
+        g = g_score[current]
+
+        for d_row, d_col in _directions(came_from.get(current), row, col,
+                                        cols):
+            jump_point = jump(row, col, d_row, d_col)
+
+            if jump_point == -1 or jump_point in closed:
+                continue
+
+            jump_row, jump_col = divmod(jump_point, cols)
+            tentative_g_score = g + abs(jump_row - row) + abs(jump_col - col)
+
+            if tentative_g_score < g_score.get(jump_point, float("inf")):
+                came_from[jump_point] = current
+                g_score[jump_point] = tentative_g_score
+
+                f_score = (tentative_g_score
+                           + abs(end_row - jump_row) + abs(end_col - jump_col))
+                heappush(open_set,
+                         (f_score, -tentative_g_score, counter, jump_point))
+                counter += 1
+
+    return FAILURE
+
+
+def _directions(parent, row, col, cols):
+    """
+    Returns the (d_row, d_col) directions to jump in from (row, col), pruned
+    by the direction it was reached from.
+    """
+
+    if parent is None:
+        return ((-1, 0), (0, -1), (0, 1), (1, 0))
+
+    parent_row, parent_col = divmod(parent, cols)
+
+    if parent_row == row:
+        d_col = 1 if col > parent_col else -1
+        return ((-1, 0), (1, 0), (0, d_col))
+
+    d_row = 1 if row > parent_row else -1
+    return ((0, -1), (0, 1), (d_row, 0))
+
+
+def _walkable(cells, rows, cols, row, col):
+    """Returns if (row, col) is inside the grid and not a wall."""
+
+    return (0 <= row < rows and 0 <= col < cols
+            and cells[row * cols + col] != WALL)
+
+
+def _forced_horizontal(cells, rows, cols, row, col, d_col):
+    """Returns if (row, col) has a forced neighbor when entered along d_col."""
+
+    return ((_walkable(cells, rows, cols, row - 1, col)
+             and not _walkable(cells, rows, cols, row - 1, col - d_col))
+            or (_walkable(cells, rows, cols, row + 1, col)
+                and not _walkable(cells, rows, cols, row + 1, col - d_col)))
+
+
+def _forced_vertical(cells, rows, cols, row, col, d_row):
+    """Returns if (row, col) has a forced neighbor when entered along d_row."""
+
+    return ((_walkable(cells, rows, cols, row, col - 1)
+             and not _walkable(cells, rows, cols, row - d_row, col - 1))
+            or (_walkable(cells, rows, cols, row, col + 1)
+                and not _walkable(cells, rows, cols, row - d_row, col + 1)))
+
+
+def _jump_horizontal(cells, rows, cols, row, col, d_col, end):
+    """
+    Scans along the row from (row, col) in direction d_col and returns the
+    index of the first jump point, or -1 when a wall or the border comes
+    first. end is the index of the end cell, or -1 to ignore it.
+    """
+
+    base = row * cols
+
+    while 0 <= col < cols and cells[base + col] != WALL:
+        if base + col == end:
+            return end
+
+        if _forced_horizontal(cells, rows, cols, row, col, d_col):
+            return base + col
+
+        col += d_col
+
+    return -1
+
+
+def _jump_vertical(cells, rows, cols, row, col, d_row, end):
+    """
+    Scans along the column from (row, col) in direction d_row and returns the
+    index of the first jump point, or -1. A cell is also a jump point when a
+    horizontal scan from it finds one.
+    """
+
+    while 0 <= row < rows and cells[row * cols + col] != WALL:
+        index = row * cols + col
+
+        if index == end:
+            return end
+
+        if (_forced_vertical(cells, rows, cols, row, col, d_row)
+                or _jump_horizontal(cells, rows, cols, row, col + 1, 1,
+                                    end) != -1
+                or _jump_horizontal(cells, rows, cols, row, col - 1, -1,
+                                    end) != -1):
+            return index
+
+        row += d_row
+
+    return -1
+
+
+def _plus_jumper(graph, end):
+    """
+    Returns a jump(row, col, d_row, d_col) function answering jumps towards
+    end from the cached JPS+ tables of graph.
+    """
+
+    tables = _tables.get(graph)
+
+    if tables is None or tables[0] != graph.version:
+        tables = (graph.version, *build_jump_tables(graph))
+        _tables[graph] = tables
+
+    _, east, west, north, south = tables
+    cols = graph.collumns
+    end_row, end_col = divmod(end, cols)
+
+    def jump(row, col, d_row, d_col):
+        index = row * cols + col
+
+        if d_col:
+            distance = (east if d_col > 0 else west)[index]
+            reach = distance if distance > 0 else -distance
+
+            if row == end_row and 0 < (end_col - col) * d_col <= reach:
+                return end
+
+            return index + distance * d_col if distance > 0 else -1
+
+        distance = (south if d_row > 0 else north)[index]
+        reach = distance if distance > 0 else -distance
+        steps = (end_row - row) * d_row
+
+        # The end's row is scanned before the precomputed jump point, a
+        # horizontal scan from there may reach the end
+        if 0 < steps <= reach and (distance <= 0 or steps < distance):
+            crossing = end_row * cols + col
+
+            if col == end_col:
+                return end
+
+            side = (east if end_col > col else west)[crossing]
+
+            if abs(end_col - col) <= -side:
+                return crossing
+
+        return index + distance * d_row * cols if distance > 0 else -1
+
+    return jump
+
+
+def build_jump_tables(graph):
+    """
+    Returns the JPS+ (east, west, north, south) jump distance tables of graph.
+
+    For the cell at index i and a direction, a positive value d means the jump
+    from i stops at the jump point d cells away, and a value -d <= 0 means the
+    jump passes d walkable cells and then hits a wall or the border.
+    """
+
+    rows, cols = graph.rows, graph.collumns
+    cells = graph._cells
+    size = rows * cols
+
+    east = array("i", bytes(4 * size))
+    west = array("i", bytes(4 * size))
+    north = array("i", bytes(4 * size))
+    south = array("i", bytes(4 * size))
+
+    def extend(table, index, neighbor, is_jump_point):
+        # Distance from index given the cell next to it in that direction
+        if neighbor == -1 or cells[neighbor] == WALL:
+            table[index] = 0
+        elif is_jump_point:
+            table[index] = 1
+        else:
+            previous = table[neighbor]
+            table[index] = previous + 1 if previous > 0 else previous - 1
+
+    for row in range(rows):
+        base = row * cols
+
+        for col in range(cols - 1, -1, -1):
+            neighbor = base + col + 1 if col + 1 < cols else -1
+            extend(east, base + col, neighbor, neighbor != -1
+                   and _forced_horizontal(cells, rows, cols, row, col + 1, 1))
+
+        for col in range(cols):
+            neighbor = base + col - 1 if col > 0 else -1
+            extend(west, base + col, neighbor, neighbor != -1
+                   and _forced_horizontal(cells, rows, cols, row, col - 1, -1))
+
+    def vertical_jump_point(row, col, d_row):
+        index = row * cols + col
+        return (_forced_vertical(cells, rows, cols, row, col, d_row)
+                or east[index] > 0 or west[index] > 0)
+
+    for row in range(rows):
+        for col in range(cols):
+            neighbor = (row - 1) * cols + col if row > 0 else -1
+            extend(north, row * cols + col, neighbor, neighbor != -1
+                   and vertical_jump_point(row - 1, col, -1))
+
+    for row in range(rows - 1, -1, -1):
+        for col in range(cols):
+            neighbor = (row + 1) * cols + col if row + 1 < rows else -1
+            extend(south, row * cols + col, neighbor, neighbor != -1
+                   and vertical_jump_point(row + 1, col, 1))
+
+    return east, west, north, south
+
+
+def reconstruct_path(graph, came_from, start, end, draw):
+    """
+    Walks the jump points back from end, fills in the straight segments
+    between them and marks the cells strictly between start and end as path.
+    """
+
+    cols = graph.collumns
+    total_path = []
+    current = end
+
+    while current != start:
+        parent = came_from[current]
+        step = cols if abs(current - parent) >= cols else 1
+
+        if parent > current:
+            step = -step
+
+        # cells from current back to (excluding) parent
+        total_path.extend(range(current, parent, -step))
+        current = parent
+
+    total_path.reverse()
+    # Drop the end, the start was never added
+    total_path.pop()
+
+    nodes = []
+
+    for index in total_path:
+        node = Node(*divmod(index, cols), graph)
+        node.update_type(NodeType.PATH)
+        nodes.append(node)
+
+        if draw is not None:
+            draw()
+
+    return nodes
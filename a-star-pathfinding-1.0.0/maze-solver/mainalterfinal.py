@@ -7,6 +7,8 @@ from a_star import a_star
 from d_star import d_star
 from d_star_lite import d_star_lite
 from dijkstra import dijkstra
+from jps import jps
+from path_cache import PathCache
 from buttons import Button
 
 pygame.init()
@@ -15,6 +17,7 @@ pygame.init()
 BACKGROUND = (0x00, 0x17, 0x1F)
 TEXT_COLOR = (255, 255, 255)
 FONT = pygame.font.Font(None, 30)
+INFO_RECT = (0, HEIGHT - 40, WIDTH, 40)  # Info panel at the bottom
 WINDOW = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Maze Solver")
 WINDOW.fill(BACKGROUND)
@@ -26,20 +29,27 @@ def get_clicked_pos(pos):
     col = (x - PADDING) // NODE_SIZE
     return row, col
 
+# Solvers selectable by name, each called as solver(graph, start_node, end_node)
+SOLVERS = {
+    'A*': a_star,
+    'D*': d_star,
+    'D* Lite': d_star_lite,
+    'Dijkstra': dijkstra,
+    'JPS': jps,
+    'JPS+': lambda graph, start, end: jps(graph, start, end, plus=True),
+}
+
+# Paths found by run_search, replayed while the grid has not changed
+path_cache = PathCache()
+
 def run_search(graph, algorithm):
     global active_algorithm, traversal_time
     active_algorithm = algorithm  # Store the active algorithm
     graph.clear_path()  # Clear previous path before running a new search
     
     start_time = time.time()
-    if algorithm == 'A*':
-        a_star(graph, graph.get_start_node(), graph.get_end_node())
-    elif algorithm == 'D*':
-        d_star(graph, graph.get_start_node(), graph.get_end_node())
-    elif algorithm == 'D* Lite':
-        d_star_lite(graph, graph.get_start_node(), graph.get_end_node())
-    elif algorithm == 'Dijkstra':
-        dijkstra(graph, graph.get_start_node(), graph.get_end_node())
+    if algorithm in SOLVERS:
+        path_cache.search(graph, algorithm, SOLVERS[algorithm])
     end_time = time.time()
     
     traversal_time = round((end_time - start_time) * 1000, 2)  # Time in milliseconds
@@ -49,6 +59,8 @@ def display_info():
     info_text = f"Algorithm: {active_algorithm if active_algorithm else 'None'} | Time: {traversal_time} ms"
     optimal_choice = "Optimal Choice: A* (Fastest)" if active_algorithm in ['A*', 'Dijkstra'] else "Optimal Choice: D* (Dynamic)"
     
+    # Clear the previous text, the screen is not cleared every frame
+    WINDOW.fill(BACKGROUND, INFO_RECT)
     text_surface = FONT.render(info_text, True, TEXT_COLOR)
     optimal_surface = FONT.render(optimal_choice, True, TEXT_COLOR)
     WINDOW.blit(text_surface, (PADDING, HEIGHT - 40))
@@ -69,23 +81,24 @@ def main():
     d_star_btn = Button((0x28, 0xF4, 0x8B), PADDING * 7, NODE_SIZE * 0.5, btn_size, lambda: run_search(graph, 'D*'))  # D*
     d_star_lite_btn = Button((0xFF, 0xA8, 0x00), PADDING * 10, NODE_SIZE * 0.5, btn_size, lambda: run_search(graph, 'D* Lite'))  # D* Lite
     dijkstra_btn = Button((0x64, 0x64, 0x64), PADDING * 13, NODE_SIZE * 0.5, btn_size, lambda: run_search(graph, 'Dijkstra'))  # Dijkstra
+    jps_btn = Button((0x8E, 0x44, 0xAD), PADDING * 16, NODE_SIZE * 0.5, btn_size, lambda: run_search(graph, 'JPS'))  # Jump Point Search
     
-    buttons = [reset_btn, maze_btn, a_star_btn, d_star_btn, d_star_lite_btn, dijkstra_btn]
+    buttons = [reset_btn, maze_btn, a_star_btn, d_star_btn, d_star_lite_btn, dijkstra_btn, jps_btn]
     
     running = True
     start_clicked = end_clicked = False
     
+    # Buttons never change, they are drawn once
+    for button in buttons:
+        button.draw(WINDOW)
+
     while running:
-        WINDOW.fill(BACKGROUND)  # Clear screen before drawing
+        # Only the cells that changed are repainted
         graph.draw(WINDOW)
         
-        # Draw buttons once per loop without flickering
-        for button in buttons:
-            button.draw(WINDOW)
-        
         # Display algorithm info and optimal choice
         display_info()
-        pygame.display.update()  # Update only once per frame
+        pygame.display.update(INFO_RECT)  # Only the info panel is redrawn every frame
         
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -1,12 +1,16 @@
 import pygame
 from graph import Graph
 from maze import generate_maze
-from constants import WIDTH, HEIGHT, ROWS, COLUMNS, PADDING, NODE_SIZE
+from constants import WIDTH, HEIGHT, ROWS, COLUMNS, PADDING, NODE_SIZE, MUD_COST, FPS
+from graph import DEFAULT_COST
 from a_star import a_star
 from d_star import d_star
 from d_star_lite import d_star_lite
 from dijkstra import dijkstra
+from jps import jps
+from search_worker import SearchWorker
 from buttons import Button
+from playback import Playback
 
 pygame.init()
 
@@ -33,16 +37,24 @@ def set_algorithm(algorithm):
     active_algorithm = algorithm
     print(f"Algorithm set to: {algorithm}")  # Debugging message
 
-# Function to run the selected algorithm's search
-def run_search(graph, algorithm):
-    if algorithm == 'A*':
-        a_star(graph, graph.get_start_node(), graph.get_end_node())
-    elif algorithm == 'D*':
-        d_star(graph, graph.get_start_node(), graph.get_end_node())
-    elif algorithm == 'D* Lite':
-        d_star_lite(graph, graph.get_start_node(), graph.get_end_node())
-    elif algorithm == 'Dijkstra':
-        dijkstra(graph, graph.get_start_node(), graph.get_end_node())
+# Solvers selectable by name, each called as
+# solver(graph, start_node, end_node, draw)
+SOLVERS = {
+    'A*': a_star,
+    'D*': d_star,
+    'D* Lite': d_star_lite,
+    'Dijkstra': dijkstra,
+    'JPS': jps,
+    'JPS+': lambda graph, start, end, draw=None: jps(graph, start, end, draw,
+                                                     plus=True),
+}
+
+# Function to run the selected algorithm's search. The search runs on the
+# worker thread and supersedes the previous one, its result is applied to the
+# grid by the main loop once it is done
+def run_search(graph, algorithm, animate=False):
+    if algorithm in SOLVERS:
+        search_worker.submit(algorithm, SOLVERS[algorithm], animate)
 
 # Main function
 def main():
@@ -54,10 +66,16 @@ def main():
     d_star_btn_color = (0x28, 0xF4, 0x8B)  # yellow-green color
     d_star_lite_btn_color = (0xFF, 0xA8, 0x00)  # orange color
     dijkstra_btn_color = (0x64, 0x64, 0x64)  # grey color
+    jps_btn_color = (0x8E, 0x44, 0xAD)  # purple color
+    jps_plus_btn_color = (0xE8, 0x43, 0x93)  # pink color
 
     # Initialize the graph
     graph = Graph(ROWS, COLUMNS)
 
+    # Searches run off the event loop, see run_search
+    global search_worker
+    search_worker = SearchWorker(graph)
+
     # Create buttons
     clear_btn = Button(clear_btn_color, PADDING, NODE_SIZE * 0.5, btn_size, graph.clear)
     clear_btn.draw(WINDOW)
@@ -111,6 +129,26 @@ def main():
     )
     dijkstra_btn.draw(WINDOW)
 
+    # Jump Point Search button
+    jps_btn = Button(
+        jps_btn_color,
+        PADDING * 16,
+        NODE_SIZE * 0.5,
+        btn_size,
+        lambda: set_algorithm('JPS'),
+    )
+    jps_btn.draw(WINDOW)
+
+    # JPS+ button
+    jps_plus_btn = Button(
+        jps_plus_btn_color,
+        PADDING * 19,
+        NODE_SIZE * 0.5,
+        btn_size,
+        lambda: set_algorithm('JPS+'),
+    )
+    jps_plus_btn.draw(WINDOW)
+
     # Initialize active_algorithm variable
     global active_algorithm
     active_algorithm = None  # Initially no algorithm is selected
@@ -120,24 +158,54 @@ def main():
     global has_searched
     has_searched = False
 
+    # Searches run at full speed, the one started from a button is then
+    # replayed on screen a few cells per frame
+    playback = None
+    clock = pygame.time.Clock()
+
     # Main event loop
     while running:
+        result = search_worker.poll()
+
+        if result is not None and result.animate:
+            playback = Playback(graph, WINDOW)
+
+        if playback is not None and not playback.step():
+            playback = None
+
         graph.draw(WINDOW)
 
+        # Edits of every event drained this frame are applied to the grid at
+        # once and replanned for once, after the loop
+        edits = 0
+
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
 
             alt_down = pygame.key.get_mods() & pygame.KMOD_ALT
+            # Shift paints mud instead of walls, shift + alt paints it away
+            shift_down = pygame.key.get_mods() & pygame.KMOD_SHIFT
+            paint_cost = DEFAULT_COST if alt_down else MUD_COST
+
+            # Space shows the rest of the search being replayed at once
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                if playback is not None:
+                    playback.fast_forward()
+                    playback = None
 
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if clear_btn.handle_event(event):
                     has_searched = False
+                    playback = None
+                    search_worker.cancel()
                     graph.clear()  # Clear the graph as well
                     graph.draw(WINDOW)
 
                 if maze_btn.handle_event(event):
                     has_searched = False
+                    playback = None
+                    search_worker.cancel()
                     graph.clear()  # Clear the graph and regenerate maze
                     generate_maze(graph, lambda: graph.draw(WINDOW))
 
@@ -146,25 +214,43 @@ def main():
                     set_algorithm('A*')
                     has_searched = True
                     # Run search immediately after selecting algorithm
-                    run_search(graph, 'A*')
+                    run_search(graph, 'A*', animate=True)
+                    playback = None
 
                 if d_star_btn.handle_event(event):
                     set_algorithm('D*')
                     has_searched = True
                     # Run search immediately after selecting algorithm
-                    run_search(graph, 'D*')
+                    run_search(graph, 'D*', animate=True)
+                    playback = None
 
                 if d_star_lite_btn.handle_event(event):
                     set_algorithm('D* Lite')
                     has_searched = True
                     # Run search immediately after selecting algorithm
-                    run_search(graph, 'D* Lite')
+                    run_search(graph, 'D* Lite', animate=True)
+                    playback = None
 
                 if dijkstra_btn.handle_event(event):
                     set_algorithm('Dijkstra')
                     has_searched = True
                     # Run search immediately after selecting algorithm
-                    run_search(graph, 'Dijkstra')
+                    run_search(graph, 'Dijkstra', animate=True)
+                    playback = None
+
+                if jps_btn.handle_event(event):
+                    set_algorithm('JPS')
+                    has_searched = True
+                    # Run search immediately after selecting algorithm
+                    run_search(graph, 'JPS', animate=True)
+                    playback = None
+
+                if jps_plus_btn.handle_event(event):
+                    set_algorithm('JPS+')
+                    has_searched = True
+                    # Run search immediately after selecting algorithm
+                    run_search(graph, 'JPS+', animate=True)
+                    playback = None
 
                 left_mouse_clicked = event.button == 1
 
@@ -176,6 +262,8 @@ def main():
                         start_clicked = True
                     elif graph.is_end(graph_coordinate):
                         end_clicked = True
+                    elif shift_down:
+                        graph.set_cost(graph_coordinate, paint_cost)
                     else:
                         graph.toggle_wall(graph_coordinate)
 
@@ -191,29 +279,33 @@ def main():
                 if start_clicked and not graph.is_wall(pos) and not graph.is_end(pos):
                     graph.update_start(pos)
 
-                    # Re-run the selected search algorithm immediately after moving start
-                    if active_algorithm:
-                        run_search(graph, active_algorithm)
+                    # Re-run the selected search algorithm after moving start
+                    edits += 1
 
                 elif end_clicked and not graph.is_wall(pos) and not graph.is_start(pos):
                     graph.update_end(pos)
 
-                    # Re-run the selected search algorithm immediately after moving end
-                    if active_algorithm:
-                        run_search(graph, active_algorithm)
+                    # Re-run the selected search algorithm after moving end
+                    edits += 1
 
                 elif not graph.is_start(pos) and not graph.is_end(pos):
-                    if alt_down:
+                    if shift_down:
+                        graph.set_cost(pos, paint_cost)
+                    elif alt_down:
                         graph.make_empty(pos)
                     else:
                         graph.make_wall(pos)
 
-                    # Re-run the selected search algorithm immediately after modifying the grid
-                    if active_algorithm:
-                        run_search(graph, active_algorithm)
+                    # Re-run the selected search algorithm after modifying the grid
+                    edits += 1
+
+        if edits and active_algorithm:
+            run_search(graph, active_algorithm)
+            playback = None
 
-        pygame.display.update()  # Always update the display at the end of the loop
+        clock.tick(FPS)
 
+    search_worker.close()
     pygame.quit()
 
 
@@ -1,83 +1,249 @@
-from random import randint
+import random
 import time
 from constants import SLEEP_SPEEP
 
 HORIZONTAL = 0
 VERTICAL = 1
 
+# Regions thinner than this are not divided any further
+MINIMUM_SIZE = 4
 
-def generate_maze(graph, draw):
+
+def generate_maze(graph, draw=None, seed=None):
     """
     Makes the specified graph into a maze using the Recursive Division Algorithm
     and draws the process specified by the draw function.
+
+    Without a draw function the maze is built at once, without sleeping, and
+    loaded into the graph in bulk. The same seed gives the same maze either
+    way.
     """
 
     graph.clear()
-    divide(graph, draw, (0, 0), (graph.rows - 1, graph.collumns - 1))
 
+    if draw is None:
+        graph.load_walls(maze_walls(graph.rows, graph.collumns, seed))
+        return
 
-def divide(graph, draw, top_left, bottom_right):
-    """Recursive Division Algorithm to generate maze."""
+    for orientation, line, first, last, hole in divisions(
+            graph.rows, graph.collumns, random.Random(seed)):
+        time.sleep(SLEEP_SPEEP)
 
-    tl_row, tl_col = top_left
-    br_row, br_col = bottom_right
+        if orientation == VERTICAL:
+            for row in range(first, last + 1):
+                graph.make_wall((row, line))
 
-    width = abs(tl_col - br_col) + 1
-    height = abs(tl_row - br_row) + 1
+            for row in range(hole, hole + 3):
+                graph.make_empty((row, line))
 
-    MINIMUM_SIZE = 4
+        else:
+            for col in range(first, last + 1):
+                graph.make_wall((line, col))
+
+            for col in range(hole, hole + 3):
+                graph.make_empty((line, col))
+
+        draw()
 
-    if width < MINIMUM_SIZE or height < MINIMUM_SIZE:
-        return
 
-    orientation = choose_orientation(width, height)
+def maze_walls(rows, collumns, seed=None):
+    """
+    Returns the walls of a Recursive Division maze of rows by collumns cells
+    as a bytearray for Graph.load_walls, one byte per cell in row-major order
+    and 1 for a wall.
+    """
 
-    time.sleep(SLEEP_SPEEP)
+    walls = bytearray(rows * collumns)
 
-    if orientation == VERTICAL:
-        wall_col = randint(tl_col + 1, br_col - 1)
+    for orientation, line, first, last, hole in divisions(
+            rows, collumns, random.Random(seed)):
+        if orientation == VERTICAL:
+            first = max(first, 0)
+            last = min(last, rows - 1)
+            walls[first * collumns + line:last * collumns + line + 1:
+                  collumns] = b"\x01" * (last - first + 1)
+            walls[hole * collumns + line] = 0
+            walls[(hole + 1) * collumns + line] = 0
+            walls[(hole + 2) * collumns + line] = 0
 
-        # draw walls
-        # To compesate for the gap between walls
-        for i in range(-2, height + 2):
-            graph.make_wall((tl_row + i, wall_col))
+        else:
+            first = max(first, 0)
+            last = min(last, collumns - 1)
+            start = line * collumns
+            walls[start + first:start + last + 1] = b"\x01" * (last - first + 1)
+            walls[start + hole:start + hole + 3] = bytes(3)
 
-        hole_1_row = randint(tl_row, br_row - 2)
-        hole_2_row = hole_1_row + 1
-        hole_3_row = hole_1_row + 2
+    return walls
 
-        graph.make_empty((hole_1_row, wall_col))
-        graph.make_empty((hole_2_row, wall_col))
-        graph.make_empty((hole_3_row, wall_col))
 
-        draw()
+def divisions(rows, collumns, rng):
+    """
+    Yields the walls of the Recursive Division of a grid of rows by collumns
+    cells, in drawing order, as (orientation, line, first, last, hole) with
+    line the row or column of the wall, first and last its inclusive ends,
+    possibly outside of the grid, and hole the first of its three openings.
 
-        divide(graph, draw, top_left, (br_row, wall_col - 2))
-        divide(graph, draw, (tl_row, wall_col + 2), bottom_right)
+    Regions are kept on an explicit stack rather than recursed into, so the
+    size of the grid is not bounded by the recursion limit.
+    """
 
-    else:
-        wall_row = randint(tl_row + 1, br_row - 1)
+    stack = [(0, 0, rows - 1, collumns - 1)]
 
-        # draw walls
-        # To compensate for the gap between the walls
-        for i in range(-2, width + 2):
-            graph.make_wall((wall_row, tl_col + i))
+    while stack:
+        tl_row, tl_col, br_row, br_col = stack.pop()
 
-        hole_1_col = randint(tl_col, br_col - 2)
-        hole_2_col = hole_1_col + 1
-        hole_3_col = hole_1_col + 2
+        width = br_col - tl_col + 1
+        height = br_row - tl_row + 1
 
-        graph.make_empty((wall_row, hole_1_col))
-        graph.make_empty((wall_row, hole_2_col))
-        graph.make_empty((wall_row, hole_3_col))
+        if width < MINIMUM_SIZE or height < MINIMUM_SIZE:
+            continue
 
-        draw()
+        # To compensate for the gap between walls, they run two cells past
+        # the region on both ends
+        if choose_orientation(width, height, rng) == VERTICAL:
+            wall_col = rng.randint(tl_col + 1, br_col - 1)
+            hole = rng.randint(tl_row, br_row - 2)
+
+            yield VERTICAL, wall_col, tl_row - 2, br_row + 2, hole
+
+            # The first half is divided first, it goes on the stack last
+            stack.append((tl_row, wall_col + 2, br_row, br_col))
+            stack.append((tl_row, tl_col, br_row, wall_col - 2))
+
+        else:
+            wall_row = rng.randint(tl_row + 1, br_row - 1)
+            hole = rng.randint(tl_col, br_col - 2)
+
+            yield HORIZONTAL, wall_row, tl_col - 2, br_col + 2, hole
+
+            stack.append((wall_row + 2, tl_col, br_row, br_col))
+            stack.append((tl_row, tl_col, wall_row - 2, br_col))
+
+
+def grid_size(width, height):
+    """
+    Returns the (rows, collumns) of the grid of a maze of width by height
+    cells made by eller_rows or sidewinder_rows.
+    """
+
+    return 2 * height - 1, 2 * width - 1
+
+
+def eller_rows(width, height, seed=None):
+    """
+    Yields the rows of a perfect maze of width by height cells made with
+    Eller's algorithm, as bytes in the format of Graph.load_walls.
+
+    Cells sit on the even rows and columns of the grid and the walls between
+    them on the odd ones, see grid_size(). Every row is yielded as soon as it
+    is made and only the sets of the current row are kept, so the memory used
+    grows with the width of the maze only.
+    """
+
+    rng = random.Random(seed)
+    rand = rng.random
+    collumns = 2 * width - 1
+
+    # Walls between every two cells of a row and under every cell
+    closed_row = b"\x00\x01" * (width - 1) + b"\x00"
+    closed_below = b"\x01" * collumns
+
+    sets = list(range(width))
+    next_set = width
+
+    for row in range(height):
+        last = row == height - 1
+        line = bytearray(closed_row)
+
+        # The columns of every set in this row
+        members = {}
+
+        for col, label in enumerate(sets):
+            if label in members:
+                members[label].append(col)
+            else:
+                members[label] = [col]
+
+        # Join neighbors of different sets at random, and all of them on the
+        # last row so that the maze ends up connected. The smaller set takes
+        # the label of the larger one
+        for col in range(width - 1):
+            left = sets[col]
+            right = sets[col + 1]
+
+            if left != right and (last or rand() < 0.5):
+                line[2 * col + 1] = 0
+                kept = members[left]
+                moved = members[right]
+
+                if len(kept) < len(moved):
+                    left, right, kept, moved = right, left, moved, kept
+
+                for other in moved:
+                    sets[other] = left
+
+                kept += moved
+                del members[right]
+
+        yield bytes(line)
+
+        if last:
+            return
+
+        # Every set goes down through at least one of its cells, the cells
+        # that do not go down start new sets
+        below = bytearray(closed_below)
+
+        for cols in members.values():
+            kept = cols[int(rand() * len(cols))]
+
+            for col in cols:
+                if col == kept or rand() < 0.5:
+                    below[2 * col] = 0
+                else:
+                    sets[col] = next_set
+                    next_set += 1
+
+        yield bytes(below)
+
+
+def sidewinder_rows(width, height, seed=None):
+    """
+    Yields the rows of a perfect maze of width by height cells made with the
+    Sidewinder algorithm, laid out like eller_rows.
+
+    The first row is a single corridor. Every later row is cut into runs of
+    cells, each of them opening north through one of its cells, so the maze
+    is biased towards long horizontal corridors.
+    """
+
+    rng = random.Random(seed)
+    rand = rng.random
+    collumns = 2 * width - 1
+
+    closed_row = b"\x00\x01" * (width - 1) + b"\x00"
+    closed_above = b"\x01" * collumns
+
+    yield bytes(collumns)
+
+    for row in range(1, height):
+        line = bytearray(closed_row)
+        above = bytearray(closed_above)
+        run_start = 0
+
+        for col in range(width):
+            if col < width - 1 and rand() < 0.5:
+                line[2 * col + 1] = 0
+            else:
+                north = rng.randint(run_start, col)
+                above[2 * north] = 0
+                run_start = col + 1
 
-        divide(graph, draw, top_left, (wall_row - 2, br_col))
-        divide(graph, draw, (wall_row + 2, tl_col), bottom_right)
+        yield bytes(above)
+        yield bytes(line)
 
 
-def choose_orientation(width, height):
+def choose_orientation(width, height, rng=random):
     """Helper function to decide which orientation to draw the wall."""
 
     if width > height:
@@ -87,4 +253,4 @@ def choose_orientation(width, height):
         return HORIZONTAL
 
     else:
-        return randint(HORIZONTAL, VERTICAL)
+        return rng.randint(HORIZONTAL, VERTICAL)
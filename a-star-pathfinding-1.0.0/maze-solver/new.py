@@ -1,5 +1,6 @@
 import pygame
 import time
+import functools
 from graph import Graph
 from maze import generate_maze
 from constants import WIDTH, HEIGHT, ROWS, COLUMNS, PADDING, NODE_SIZE
@@ -7,6 +8,9 @@ from a_star import a_star
 from d_star import d_star
 from d_star_lite import d_star_lite
 from dijkstra import dijkstra
+from jps import jps
+from path_cache import PathCache
+from search_stats import SearchStats
 from buttons import Button
 
 pygame.init()
@@ -15,6 +19,7 @@ pygame.init()
 BACKGROUND = (0x00, 0x17, 0x1F)
 TEXT_COLOR = (255, 255, 255)
 FONT = pygame.font.Font(None, 30)
+INFO_RECT = (0, HEIGHT - 80, WIDTH, 80)  # Info panel at the bottom
 WINDOW = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Maze Solver")
 WINDOW.fill(BACKGROUND)
@@ -23,6 +28,9 @@ WINDOW.fill(BACKGROUND)
 best_algorithm = None
 best_time = None
 
+# Counters of the last search, for the solvers that record them
+search_stats = None
+
 def get_clicked_pos(pos):
     """Returns the (row, col) pair on the graph from the specified (x, y) on the screen."""
     x, y = pos
@@ -30,24 +38,43 @@ def get_clicked_pos(pos):
     col = (x - PADDING) // NODE_SIZE
     return row, col
 
+# Solvers selectable by name, each called as solver(graph, start_node, end_node)
+SOLVERS = {
+    'A*': a_star,
+    'D*': d_star,
+    'D* Lite': d_star_lite,
+    'Dijkstra': dijkstra,
+    'JPS': jps,
+    'JPS+': lambda graph, start, end: jps(graph, start, end, plus=True),
+}
+
+# Solvers taking a stats argument
+COUNTED = {'A*', 'D*', 'D* Lite', 'Dijkstra'}
+
+# Paths found by run_search, replayed while the grid has not changed
+path_cache = PathCache()
+
 def run_search(graph, algorithm):
     """Executes the selected pathfinding algorithm and tracks performance."""
-    global active_algorithm, traversal_time, best_algorithm, best_time
+    global active_algorithm, traversal_time, best_algorithm, best_time, search_stats
     
     active_algorithm = algorithm  
     graph.clear_path()  
 
+    stats = SearchStats() if algorithm in COUNTED else None
     start_time = time.time()
-    if algorithm == 'A*':
-        a_star(graph, graph.get_start_node(), graph.get_end_node())
-    elif algorithm == 'D*':
-        d_star(graph, graph.get_start_node(), graph.get_end_node())
-    elif algorithm == 'D* Lite':
-        d_star_lite(graph, graph.get_start_node(), graph.get_end_node())
-    elif algorithm == 'Dijkstra':
-        dijkstra(graph, graph.get_start_node(), graph.get_end_node())
+    if algorithm in SOLVERS:
+        solver = SOLVERS[algorithm]
+        if stats is not None:
+            solver = functools.partial(solver, stats=stats)
+        path_cache.search(graph, algorithm, solver)
     end_time = time.time()
 
+    # A replayed path says nothing about how fast the algorithm is
+    if path_cache.last_hit:
+        return
+
+    search_stats = stats
     traversal_time = round((end_time - start_time) * 1000, 2)  # Convert to milliseconds
 
     # Update the best algorithm if this one is faster
@@ -58,31 +85,43 @@ def run_search(graph, algorithm):
 def display_info():
     """Displays the selected algorithm, traversal time, and best algorithm in a visible row format."""
     info_text = f"Algorithm: {active_algorithm if active_algorithm else 'None'} | Time: {traversal_time} ms"
-    
+
+    if search_stats is not None:
+        info_text += (f" (init {search_stats.init_seconds * 1000:.1f}"
+                      f" / search {search_stats.search_seconds * 1000:.1f}"
+                      f" / path {search_stats.reconstruct_seconds * 1000:.1f})")
+        stats_text = (f"Expanded: {search_stats.expanded} | Pushes: {search_stats.pushes}"
+                      f" | Pops: {search_stats.pops} ({search_stats.stale_pops} stale)"
+                      f" | Peak open: {search_stats.peak_open} | Path: {search_stats.path_length}")
+    else:
+        stats_text = "Expanded: - | Pushes: - | Pops: - | Peak open: - | Path: -"
+
     if best_algorithm:
         best_text = f"Best Algorithm: {best_algorithm} | {best_time} ms"
     else:
         best_text = "Best Algorithm: None"
 
     optimal_choice = "Optimal Choice: A* (Fastest)" if active_algorithm in ['A*', 'Dijkstra'] else "Optimal Choice: D* (Dynamic)"
+    best_text += f" | {optimal_choice}"
 
     # Background rectangle for better readability
-    pygame.draw.rect(WINDOW, (20, 20, 20), (0, HEIGHT - 80, WIDTH, 80))  
+    pygame.draw.rect(WINDOW, (20, 20, 20), INFO_RECT)
 
     # Render text and place them in separate rows
     text_surface = FONT.render(info_text, True, TEXT_COLOR)
+    stats_surface = FONT.render(stats_text, True, TEXT_COLOR)
     best_surface = FONT.render(best_text, True, TEXT_COLOR)
-    optimal_surface = FONT.render(optimal_choice, True, TEXT_COLOR)
 
     # Display at the bottom of the screen in separate rows
     WINDOW.blit(text_surface, (PADDING, HEIGHT - 70))
-    WINDOW.blit(best_surface, (PADDING, HEIGHT - 50))
-    WINDOW.blit(optimal_surface, (PADDING, HEIGHT - 30))
+    WINDOW.blit(stats_surface, (PADDING, HEIGHT - 50))
+    WINDOW.blit(best_surface, (PADDING, HEIGHT - 30))
 
 
 def main():
-    global active_algorithm, traversal_time, best_algorithm, best_time
+    global active_algorithm, traversal_time, best_algorithm, best_time, search_stats
     active_algorithm = None  
+    search_stats = None
     traversal_time = 0
     best_algorithm = None  
     best_time = None  
@@ -97,23 +136,24 @@ def main():
     d_star_btn = Button((0x28, 0xF4, 0x8B), PADDING * 7, NODE_SIZE * 0.5, btn_size, lambda: run_search(graph, 'D*'))  # D*
     d_star_lite_btn = Button((0xFF, 0xA8, 0x00), PADDING * 10, NODE_SIZE * 0.5, btn_size, lambda: run_search(graph, 'D* Lite'))  # D* Lite
     dijkstra_btn = Button((0x64, 0x64, 0x64), PADDING * 13, NODE_SIZE * 0.5, btn_size, lambda: run_search(graph, 'Dijkstra'))  # Dijkstra
+    jps_btn = Button((0x8E, 0x44, 0xAD), PADDING * 16, NODE_SIZE * 0.5, btn_size, lambda: run_search(graph, 'JPS'))  # Jump Point Search
     
-    buttons = [reset_btn, maze_btn, a_star_btn, d_star_btn, d_star_lite_btn, dijkstra_btn]
+    buttons = [reset_btn, maze_btn, a_star_btn, d_star_btn, d_star_lite_btn, dijkstra_btn, jps_btn]
     
     running = True
     start_clicked = end_clicked = False
     
+    # Buttons never change, they are drawn once
+    for button in buttons:
+        button.draw(WINDOW)
+
     while running:
-        WINDOW.fill(BACKGROUND)  # Clear screen before drawing
+        # Only the cells that changed are repainted
         graph.draw(WINDOW)
         
-        # Draw buttons
-        for button in buttons:
-            button.draw(WINDOW)
-        
         # Display algorithm info and best algorithm
         display_info()
-        pygame.display.update()  # Update only once per frame
+        pygame.display.update(INFO_RECT)  # Only the info panel is redrawn every frame
         
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
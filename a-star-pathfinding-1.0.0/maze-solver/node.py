@@ -1,21 +1,30 @@
-import pygame
-from constants import NODE_SIZE, PADDING
-from node_type import NodeType
+from node_type import NodeType, CELL_TYPES, CELL_CODES
 
 
 class Node:
-    """Represent a node in the graph."""
+    """
+    Represent a node in the graph.
 
-    def __init__(self, row, col, node_type):
-        """Constructs a Node object."""
+    A Node is a lightweight view of one cell of a Graph: the state of the cell
+    lives in the Graph's cell array and is read and written through the view.
+    Two views of the same cell compare equal and hash the same.
+    """
+
+    __slots__ = ("row", "col", "_graph", "_index")
+
+    def __init__(self, row, col, graph):
+        """Constructs a view of the cell at (row, col) in the specified graph."""
 
         self.row = row
         self.col = col
-        # Top left coordinate of this Node on the screen
-        # Account for the PADDING to center the whole graph
-        self.coordinate = (col * NODE_SIZE + PADDING,
-                           row * NODE_SIZE + PADDING)
-        self.node_type = node_type
+        self._graph = graph
+        self._index = row * graph.collumns + col
+
+    @property
+    def node_type(self):
+        """The NodeType of this Node."""
+
+        return CELL_TYPES[self._graph._cells[self._index]]
 
     def is_wall(self):
         """Returns if this node is a wall."""
@@ -58,14 +67,20 @@ class Node:
     def update_type(self, new_type):
         """Changes the type of this Node."""
 
-        self.node_type = new_type
+        self._graph._set(self._index, CELL_CODES[new_type])
+
+    def __eq__(self, other):
+        if not isinstance(other, Node):
+            return NotImplemented
 
-    def draw(self, window):
-        """Draws this Node on the specified window."""
+        return (self._index == other._index
+                and self._graph is other._graph)
 
-        color = self.node_type.value
-        x, y = self.coordinate
-        pygame.draw.rect(window, color, (x, y, NODE_SIZE, NODE_SIZE))
+    def __hash__(self):
+        return self._index
 
     def __lt__(self, other):
         return True
+
+    def __repr__(self):
+        return f"Node({self.row}, {self.col}, {self.node_type.name})"
@@ -10,3 +10,19 @@ class NodeType(Enum):
     PATH = (0xff, 0xb4, 0x00)
     EMPTY = (0xf4, 0xf4, 0xf4)
     VISITED = (0x00, 0xa8, 0xe8)
+
+
+# Compact cell codes stored in the Graph's cell array. CELL_TYPES maps a code
+# back to its NodeType and CELL_CODES maps a NodeType to its code.
+EMPTY, WALL, START, END, VISITED, PATH = range(6)
+
+CELL_TYPES = (
+    NodeType.EMPTY,
+    NodeType.WALL,
+    NodeType.START,
+    NodeType.END,
+    NodeType.VISITED,
+    NodeType.PATH,
+)
+
+CELL_CODES = {node_type: code for code, node_type in enumerate(CELL_TYPES)}
@@ -0,0 +1,75 @@
+import weakref
+from collections import OrderedDict
+from node import Node
+from node_type import NodeType
+
+
+class PathCache:
+    """
+    Bounded LRU cache of solver results for one Graph at a time.
+
+    Entries are keyed by (graph.version, start, end, algorithm). Graph.version
+    changes with every wall edit, so checking that an entry is still valid is
+    a tuple lookup rather than a hash of the grid. Using the cache with
+    another Graph drops every entry.
+    """
+
+    def __init__(self, maxsize=256):
+        """Constructs an empty cache holding at most maxsize paths."""
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.last_hit = False
+        self._entries = OrderedDict()
+        self._graph = None
+
+    def search(self, graph, algorithm, solver):
+        """
+        Returns the path solver(graph, start_node, end_node) finds between the
+        graph's start and end, replaying it from the cache when an identical
+        search already ran on the same grid.
+        """
+
+        if self._graph is None or self._graph() is not graph:
+            self._graph = weakref.ref(graph)
+            self._entries.clear()
+
+        key = (graph.version, graph.start, graph.end, algorithm)
+        path = self._entries.get(key)
+
+        if path is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.last_hit = True
+            return self._replay(graph, path)
+
+        self.misses += 1
+        self.last_hit = False
+        nodes = solver(graph, graph.get_start_node(), graph.get_end_node())
+
+        self._entries[key] = tuple((node.row, node.col) for node in nodes)
+
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+        return nodes
+
+    def _replay(self, graph, path):
+        """Marks a cached path on graph and returns it as Nodes."""
+
+        graph.clear_path()
+        nodes = []
+
+        for row, col in path:
+            node = Node(row, col, graph)
+            node.update_type(NodeType.PATH)
+            nodes.append(node)
+
+        return nodes
+
+    def clear(self):
+        """Drops every cached path and resets the counters."""
+
+        self._entries.clear()
+        self.hits = self.misses = 0
@@ -0,0 +1,79 @@
+"""
+Replays a finished search on the screen under a frame budget.
+
+Solvers record every cell they mark in the Graph's dirty list, in order, so
+once a search has run at full speed without a draw callback the list is a log
+of it: a cell shows up when it is expanded and again when it is put on the
+path. A Playback hides those cells and reveals a fixed number of marks every
+frame, so how long the animation takes no longer depends on the search.
+"""
+import math
+from collections import Counter
+from renderer import get_renderer
+from node_type import EMPTY, VISITED
+from constants import FPS, PLAYBACK_SECONDS
+
+
+class Playback:
+    """Frame by frame replay of the last search run on a Graph."""
+
+    def __init__(self, graph, window, steps_per_frame=None,
+                 duration=PLAYBACK_SECONDS, fps=FPS):
+        """
+        Prepares the replay of the last search run on graph. Every step()
+        shows steps_per_frame more marks, by default as many as needed for
+        the whole search to play in about duration seconds at fps frames per
+        second.
+        """
+
+        cells = graph._cells
+        touched = list(graph._touched)
+
+        # Every appearance of a cell but its last one is an expansion, the
+        # last one shows what the cell ended up as
+        remaining = Counter(touched)
+        events = []
+
+        for index in touched:
+            remaining[index] -= 1
+            code = VISITED if remaining[index] else cells[index]
+            events.append((index, code))
+
+        if steps_per_frame is None:
+            steps_per_frame = math.ceil(len(events) / (duration * fps))
+
+        self.events = events
+        self.steps_per_frame = max(1, steps_per_frame)
+        self.position = 0
+
+        self.renderer = get_renderer(graph, window)
+        self.renderer.override({index: EMPTY for index in remaining})
+
+    def done(self):
+        """Returns if the whole search is shown."""
+
+        return self.position >= len(self.events)
+
+    def step(self):
+        """
+        Shows the next marks, to be called once per frame before drawing the
+        Graph. Returns False once the whole search is shown.
+        """
+
+        end = min(self.position + self.steps_per_frame, len(self.events))
+
+        # Later marks of a cell replace the earlier ones of the same frame
+        self.renderer.override(dict(self.events[self.position:end]))
+        self.position = end
+
+        if self.done():
+            self.renderer.release()
+            return False
+
+        return True
+
+    def fast_forward(self):
+        """Shows the rest of the search at once."""
+
+        self.position = len(self.events)
+        self.renderer.release()
@@ -0,0 +1,280 @@
+"""
+Draws a Graph with pygame.
+
+This is the only module of the grid model that depends on pygame, the Graph,
+its Nodes and the solvers can be imported and run without a display.
+
+Graph.draw goes through a GridRenderer kept per Graph, which repaints only the
+cells that changed since the previous frame.
+"""
+import weakref
+import pygame
+from graph import WALL_ADDED, WALL_REMOVED, RESET, COST_CHANGED, DEFAULT_COST
+from node_type import CELL_TYPES, NodeType, EMPTY
+from constants import NODE_SIZE, BORDER, PADDING, MUD_COST
+
+# Color of the costliest empty cells
+MUD = (0x8d, 0x6e, 0x63)
+
+
+def _cost_color(cost):
+    """Returns the color of an empty cell costing cost to enter."""
+
+    shade = min(max(cost - 1, 0), MUD_COST - 1)
+    return tuple(empty + (mud - empty) * shade // (MUD_COST - 1)
+                 for empty, mud in zip(NodeType.EMPTY.value, MUD))
+
+
+# Color of an empty cell for every cost, fading from the empty color at cost
+# 1 to MUD at MUD_COST and above
+COST_COLORS = tuple(_cost_color(cost) for cost in range(256))
+
+# One renderer per Graph, used by draw_graph
+_renderers = weakref.WeakKeyDictionary()
+
+
+def screen_coordinate(row, col):
+    """
+    Returns the top left (x, y) of the cell at (row, col) on the screen.
+    Account for the PADDING to center the whole graph
+    """
+
+    return (col * NODE_SIZE + PADDING, row * NODE_SIZE + PADDING)
+
+
+def draw_graph(graph, window):
+    """
+    Draws what changed in the specified Graph since the last call on the
+    specified window.
+    """
+
+    get_renderer(graph, window).draw()
+
+
+def get_renderer(graph, window):
+    """Returns the GridRenderer of the specified Graph on the window."""
+
+    renderer = _renderers.get(graph)
+
+    if renderer is None or renderer.window is not window:
+        if renderer is not None:
+            renderer.close()
+
+        renderer = GridRenderer(graph, window)
+        _renderers[graph] = renderer
+
+    return renderer
+
+
+def draw_node(node, window):
+    """Draws the specified Node on the specified window."""
+
+    x, y = screen_coordinate(node.row, node.col)
+    color = node.node_type.value
+
+    if color == NodeType.EMPTY.value:
+        color = COST_COLORS[node._graph.get_costs()[node._index]]
+
+    pygame.draw.rect(window, color, (x, y, NODE_SIZE, NODE_SIZE))
+
+
+def draw_nodes(graph, window):
+    """Draws the nodes of the specified Graph on the specified window."""
+
+    cols = graph.collumns
+    costs = graph.get_costs()
+
+    for index, code in enumerate(graph._cells):
+        x, y = screen_coordinate(*divmod(index, cols))
+
+        if code == EMPTY:
+            color = COST_COLORS[costs[index]]
+        else:
+            color = CELL_TYPES[code].value
+
+        pygame.draw.rect(window, color, (x, y, NODE_SIZE, NODE_SIZE))
+
+
+def draw_lines(graph, window):
+    """Draws the border between each node on the specified window."""
+
+    # top of the Graph
+    top = PADDING
+    # bottom of the Graph
+    bottom = NODE_SIZE * graph.rows + PADDING
+    # left side of the Graph
+    left = PADDING
+    # right side of the Graph
+    right = NODE_SIZE * graph.collumns + PADDING
+
+    for i in range(graph.rows + 1):
+        y = i * NODE_SIZE + PADDING
+        pygame.draw.line(window, BORDER, (left, y), (right, y))
+
+    for j in range(graph.collumns + 1):
+        x = j * NODE_SIZE + PADDING
+        pygame.draw.line(window, BORDER, (x, top), (x, bottom))
+
+
+class GridRenderer:
+    """
+    Incremental renderer of one Graph on one window.
+
+    The empty grid, lines included, is rendered once onto a background
+    surface. Cells are then filled inside the lines, so repainting a cell
+    never touches its neighbors or the lines, and every draw() only fills the
+    cells that changed and updates their rects on the display.
+
+    Changed cells are collected from three places:
+
+    - the Graph's listeners, for walls and costs;
+    - the start and end positions, compared with the previous frame;
+    - the Graph's dirty list of visited and path marks, read from where the
+      previous frame stopped. A new list means clear_path ran, and every cell
+      of the old list has to be repainted.
+
+    Cells can be shown with another code than their own with override(),
+    this is how a Playback replays a search that already finished.
+    """
+
+    def __init__(self, graph, window):
+        """Constructs a renderer of graph on window, painting it all first."""
+
+        self.graph = graph
+        self.window = window
+
+        width = NODE_SIZE * graph.collumns
+        height = NODE_SIZE * graph.rows
+
+        # The background starts at the top left corner of the grid, its
+        # last row and column hold the bottom and right lines
+        self.background = pygame.Surface((width + 1, height + 1))
+        self.background.fill(NodeType.EMPTY.value)
+
+        for y in range(0, height + 1, NODE_SIZE):
+            pygame.draw.line(self.background, BORDER, (0, y), (width, y))
+
+        for x in range(0, width + 1, NODE_SIZE):
+            pygame.draw.line(self.background, BORDER, (x, 0), (x, height))
+
+        self._dirty = set()
+        self._full = True
+        # index -> code shown instead of the cell's own
+        self._overrides = {}
+        self._touched = graph._touched
+        self._cursor = 0
+        self._start = graph.start
+        self._end = graph.end
+
+        graph.subscribe(self._on_change)
+
+    def close(self):
+        """Stops listening to the Graph."""
+
+        self.graph.unsubscribe(self._on_change)
+
+    def _on_change(self, kind, index):
+        """Graph listener, records the cells to repaint."""
+
+        if kind == WALL_ADDED or kind == WALL_REMOVED or kind == COST_CHANGED:
+            self._dirty.add(index)
+            self._overrides.pop(index, None)
+        elif kind == RESET:
+            self._full = True
+            self._overrides.clear()
+
+    def invalidate(self):
+        """Repaints the whole grid on the next draw()."""
+
+        self._full = True
+
+    def override(self, codes):
+        """
+        Shows the cells of the {index: code} mapping codes with those codes
+        instead of their own, until they change or release() is called.
+        """
+
+        # Changes made before the override are not covered by it
+        self._collect()
+
+        self._overrides.update(codes)
+        self._dirty.update(codes)
+
+    def release(self):
+        """Shows every cell with its own code again."""
+
+        self._dirty.update(self._overrides)
+        self._overrides.clear()
+
+    def _collect(self):
+        """Adds the cells changed since the last draw() to the dirty set."""
+
+        graph = self.graph
+        dirty = self._dirty
+
+        if graph._touched is not self._touched:
+            # The marks were cleared, whatever was overridden is gone too
+            dirty.update(self._touched)
+            dirty.update(self._overrides)
+            self._overrides.clear()
+            self._touched = graph._touched
+            self._cursor = 0
+
+        touched = self._touched
+        dirty.update(touched[self._cursor:])
+        self._cursor = len(touched)
+
+        if graph.start != self._start or graph.end != self._end:
+            for row, col in (self._start, self._end, graph.start, graph.end):
+                dirty.add(row * graph.collumns + col)
+
+            self._start, self._end = graph.start, graph.end
+
+    def _fill(self, index, code, costs):
+        """Fills the cell at index inside its lines and returns its rect."""
+
+        x, y = screen_coordinate(*divmod(index, self.graph.collumns))
+
+        if code == EMPTY:
+            color = COST_COLORS[costs[index]]
+        else:
+            color = CELL_TYPES[code].value
+
+        rect = (x + 1, y + 1, NODE_SIZE - 1, NODE_SIZE - 1)
+        self.window.fill(color, rect)
+
+        return rect
+
+    def draw(self):
+        """Paints the changed cells and updates only their rects."""
+
+        self._collect()
+
+        cells = self.graph._cells
+        costs = self.graph.get_costs()
+        overrides = self._overrides
+
+        if self._full:
+            self._full = False
+            self._dirty.clear()
+
+            self.window.blit(self.background, (PADDING, PADDING))
+
+            for index, code in enumerate(cells):
+                code = overrides.get(index, code)
+
+                if code != EMPTY or costs[index] != DEFAULT_COST:
+                    self._fill(index, code, costs)
+
+            pygame.display.update((PADDING, PADDING,
+                                   *self.background.get_size()))
+            return
+
+        if not self._dirty:
+            return
+
+        rects = [self._fill(index, overrides.get(index, cells[index]), costs)
+                 for index in self._dirty]
+        self._dirty.clear()
+
+        pygame.display.update(rects)
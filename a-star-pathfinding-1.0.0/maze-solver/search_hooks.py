@@ -0,0 +1,88 @@
+"""
+Callbacks into a running search.
+
+a_star, dijkstra, d_star and d_star_lite take a SearchHooks as their hooks
+argument and report every event of the search to it with the coordinates of
+the cell and its scores. A solver reads the callbacks once before it starts
+and tests each one for None where its event happens, so an event nobody
+listens to costs a comparison and a search without hooks makes no call at
+all. Visualization, tracing and profiling are all built as hooks, the draw
+argument the solvers took before is one of them, see callbacks.
+"""
+
+
+class SearchHooks:
+    """
+    The callbacks of a search, every one optional:
+
+    - on_expand(row, col, g, f): the cell is taken out of the open set and
+      expanded. It may raise to abandon the search. d_star and d_star_lite
+      call it before the entry is popped, so they can resume later;
+    - on_push(row, col, g, f): an entry for the cell is added to the open set;
+    - on_relax(row, col, g): the score of the cell was updated to g;
+    - on_path_node(row, col): the cell is marked as path, called for the
+      returned Nodes in order;
+    - on_done(path): the search is over, path being what the solver returns.
+
+    g is the cost from the origin of the search, which is the end for the
+    backward searches of d_star and d_star_lite, and f the priority of the
+    cell in the open set, g plus the heuristic for a_star and d_star_lite and
+    g itself for dijkstra and d_star.
+    """
+
+    __slots__ = ("on_expand", "on_push", "on_relax", "on_path_node",
+                 "on_done")
+
+    def __init__(self, on_expand=None, on_push=None, on_relax=None,
+                 on_path_node=None, on_done=None):
+        """Constructs hooks calling the specified callbacks."""
+
+        self.on_expand = on_expand
+        self.on_push = on_push
+        self.on_relax = on_relax
+        self.on_path_node = on_path_node
+        self.on_done = on_done
+
+
+# What callbacks returns without hooks nor draw
+NO_CALLBACKS = (None, None, None, None, None)
+
+
+def _then_draw(callback, draw):
+    """Returns a callback calling callback, when there is one, then draw."""
+
+    if callback is None:
+        def draw_after(*args):
+            draw()
+    else:
+        def draw_after(*args):
+            callback(*args)
+            draw()
+
+    return draw_after
+
+
+def callbacks(hooks, draw=None):
+    """
+    Returns the (on_expand, on_push, on_relax, on_path_node, on_done)
+    callbacks of hooks, None for those not set, as the solvers read them.
+
+    draw, the parameterless callback the solvers took before hooks, is
+    called after every expansion and every path cell, following on_expand and
+    on_path_node when hooks has them.
+    """
+
+    if hooks is None:
+        if draw is None:
+            return NO_CALLBACKS
+
+        hooks = SearchHooks()
+
+    on_expand, on_path_node = hooks.on_expand, hooks.on_path_node
+
+    if draw is not None:
+        on_expand = _then_draw(on_expand, draw)
+        on_path_node = _then_draw(on_path_node, draw)
+
+    return (on_expand, hooks.on_push, hooks.on_relax, on_path_node,
+            hooks.on_done)
@@ -0,0 +1,38 @@
+from array import array
+
+# Largest value an unsigned 32 bit stamp can hold
+_MAX_GENERATION = 0xFFFFFFFF
+
+
+class SearchSpace:
+    """
+    Flat per-cell scratch arrays shared by the searches run on one Graph.
+
+    The arrays are indexed like the Graph's cells (row * collumns + col). A
+    cell's g_score and came_from entries are only meaningful when its stamp
+    equals the current generation, and a cell is closed when its closed
+    stamp does, so starting a new search is O(1) instead of resetting every
+    cell.
+    """
+
+    def __init__(self, size):
+        """Constructs the scratch arrays for a grid of the specified size."""
+
+        self.size = size
+        self.generation = 0
+        self.stamp = array("I", bytes(4 * size))
+        self.g_score = array("i", bytes(4 * size))
+        self.came_from = array("i", bytes(4 * size))
+        self.closed = array("I", bytes(4 * size))
+
+    def begin(self):
+        """Starts a new search and returns its generation."""
+
+        self.generation += 1
+
+        if self.generation > _MAX_GENERATION:
+            self.stamp = array("I", bytes(4 * self.size))
+            self.closed = array("I", bytes(4 * self.size))
+            self.generation = 1
+
+        return self.generation
@@ -0,0 +1,104 @@
+"""
+How much work a search did.
+
+a_star, dijkstra, d_star and d_star_lite fill the SearchStats passed as their
+stats argument. Without one they skip the clock entirely, and the counters
+are either read off state the search keeps anyway, like the heap entry
+counter of a_star, or plain local increments, so collecting is close to free
+when it is disabled.
+"""
+from time import perf_counter
+
+
+class SearchStats:
+    """
+    The counters and timings of one search.
+
+    - expanded: cells taken out of the open set and expanded;
+    - pushes and pops: entries added to and taken out of the open set;
+    - stale_pops: popped entries that were outdated and skipped;
+    - peak_open: the largest number of entries in the open set;
+    - path_length: the number of Nodes returned;
+    - init_seconds, search_seconds and reconstruct_seconds: the time spent
+      setting the search up, expanding cells and walking the path back.
+
+    The incremental solvers only count the work of the call, not what they
+    reused from earlier calls.
+    """
+
+    def __init__(self):
+        """Constructs empty statistics."""
+
+        self.expanded = 0
+        self.pushes = 0
+        self.pops = 0
+        self.stale_pops = 0
+        self.peak_open = 0
+        self.path_length = 0
+        self.init_seconds = 0.0
+        self.search_seconds = 0.0
+        self.reconstruct_seconds = 0.0
+        self._mark = 0.0
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value!r}"
+                           for name, value in self.as_dict().items())
+        return f"SearchStats({fields})"
+
+    def total_seconds(self):
+        """Returns the time spent in the search as a whole."""
+
+        return self.init_seconds + self.search_seconds + self.reconstruct_seconds
+
+    def as_dict(self):
+        """Returns the counters and timings as a dict."""
+
+        return {
+            "expanded": self.expanded,
+            "pushes": self.pushes,
+            "pops": self.pops,
+            "stale_pops": self.stale_pops,
+            "peak_open": self.peak_open,
+            "path_length": self.path_length,
+            "init_seconds": self.init_seconds,
+            "search_seconds": self.search_seconds,
+            "reconstruct_seconds": self.reconstruct_seconds,
+        }
+
+    def _lap(self):
+        """Returns the seconds since the previous phase ended."""
+
+        now = perf_counter()
+        elapsed = now - self._mark
+        self._mark = now
+
+        return elapsed
+
+    # Called by the solvers, in this order. A search that fails before
+    # expanding anything goes from end_init() straight to end()
+
+    def begin(self):
+        """Starts the clock, when the solver is called."""
+
+        self._mark = perf_counter()
+
+    def end_init(self):
+        """Ends the setup, right before the first cell is expanded."""
+
+        self.init_seconds += self._lap()
+
+    def end_search(self, expanded, pushes, pops, stale_pops, peak_open):
+        """Ends the expansions and records their counters."""
+
+        self.search_seconds += self._lap()
+        self.expanded = expanded
+        self.pushes = pushes
+        self.pops = pops
+        self.stale_pops = stale_pops
+        self.peak_open = peak_open
+
+    def end(self, path):
+        """Ends the search, path being what the solver returns."""
+
+        self.reconstruct_seconds += self._lap()
+        self.path_length = len(path)
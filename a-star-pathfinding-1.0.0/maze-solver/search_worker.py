@@ -0,0 +1,319 @@
+"""
+Runs searches on a background thread so that the UI never waits for them.
+
+A SearchWorker keeps a mirror of one Graph, owned by its thread, and solves on
+the mirror. The UI thread only records which cells changed; submit() hands
+the worker their new state along with the start and end, so the mirror is
+brought up to date with a few edits instead of a copy of the grid, and the
+solver caches kept per Graph (D* Lite planners, JPS+ tables, the HPA*
+hierarchy, the connectivity index) stay warm across searches.
+
+A new request supersedes the previous one: a request still waiting is merged
+into it and a search in progress is cancelled. Cancellation is cooperative,
+the worker's draw callback raises once its request is superseded, which stops
+any solver at its next expanded cell. poll() applies the result of the latest
+request only, and only when the grid did not change since it was submitted.
+"""
+import threading
+import time
+from graph import WALL_ADDED, WALL_REMOVED, RESET, COST_CHANGED, Graph
+from node_type import EMPTY, WALL, START, END, VISITED, PATH
+from path_cache import PathCache
+
+# Edits beyond this fraction of the cells are sent as a whole snapshot
+_SNAPSHOT_FRACTION = 1 / 64
+
+
+class _Cancelled(Exception):
+    """Raised by the worker's draw callback to stop a superseded search."""
+
+
+class SearchRequest:
+    """A search handed to the worker, along with the edits it has to see."""
+
+    def __init__(self, number, algorithm, solver, animate, graph, edits,
+                 snapshot):
+        self.number = number
+        self.algorithm = algorithm
+        self.solver = solver
+        self.animate = animate
+        self.start = graph.start
+        self.end = graph.end
+        self.version = graph.version
+        # {index: (is_wall, cost)} of the cells changed since the previous
+        # request, or None when snapshot holds the whole grid instead
+        self.edits = edits
+        # (walls, costs) as given to load_walls and load_costs
+        self.snapshot = snapshot
+        self.cancelled = False
+
+    def merge(self, older):
+        """Takes over the edits of an older request that never ran."""
+
+        if self.snapshot is not None:
+            return
+
+        # The older snapshot is taken before these edits, which still apply on
+        # top of it
+        self.snapshot = older.snapshot
+        older.edits.update(self.edits)
+        self.edits = older.edits
+
+
+class SearchResult:
+    """What a finished search marked on the worker's mirror."""
+
+    def __init__(self, request, nodes, touched, codes, seconds, cache_hit):
+        self.request = request
+        self.algorithm = request.algorithm
+        self.animate = request.animate
+        # (row, col) of the path between start and end, empty without one
+        self.path = [(node.row, node.col) for node in nodes or ()]
+        self.touched = touched
+        self.codes = codes
+        self.seconds = seconds
+        self.cache_hit = cache_hit
+
+
+class SearchWorker:
+    """Background searches on the grid of one Graph, latest request wins."""
+
+    def __init__(self, graph):
+        """Starts the worker thread of graph."""
+
+        self.graph = graph
+        self.requests = 0
+        self.cancelled = 0
+
+        self._number = 0
+        self._edits = set()
+        self._reset = True
+        self._pending = None
+        self._running = None
+        self._result = None
+        self._closed = False
+        self._condition = threading.Condition()
+
+        # Only the worker thread touches the mirror and its cache
+        self._mirror = Graph(graph.rows, graph.collumns, graph.start,
+                             graph.end)
+        self._path_cache = PathCache()
+
+        graph.subscribe(self._on_change)
+
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name="search-worker")
+        self._thread.start()
+
+    def close(self):
+        """Stops listening to the Graph and stops the worker thread."""
+
+        self.graph.unsubscribe(self._on_change)
+
+        with self._condition:
+            self._closed = True
+
+            if self._running is not None:
+                self._running.cancelled = True
+
+            self._condition.notify()
+
+        self._thread.join()
+
+    def _on_change(self, kind, index):
+        """Graph listener, records the cells the mirror has to update."""
+
+        if kind == WALL_ADDED or kind == WALL_REMOVED or kind == COST_CHANGED:
+            self._edits.add(index)
+        elif kind == RESET:
+            self._reset = True
+            self._edits.clear()
+
+    def submit(self, algorithm, solver, animate=False):
+        """
+        Queues a search of solver(graph, start_node, end_node, draw) between
+        the Graph's current start and end, superseding every earlier request.
+        Returns the number of the request.
+        """
+
+        graph = self.graph
+        cells = graph._cells
+        costs = graph._costs
+
+        if self._reset or len(self._edits) > len(cells) * _SNAPSHOT_FRACTION:
+            edits = {}
+            snapshot = (graph.get_walls(), bytes(costs))
+        else:
+            edits = {index: (cells[index] == WALL, costs[index])
+                     for index in self._edits}
+            snapshot = None
+
+        self._edits = set()
+        self._reset = False
+        self._number += 1
+
+        request = SearchRequest(self._number, algorithm, solver, animate,
+                                graph, edits, snapshot)
+
+        with self._condition:
+            if self._pending is not None:
+                request.merge(self._pending)
+
+            if self._running is not None and not self._running.cancelled:
+                self._running.cancelled = True
+                self.cancelled += 1
+
+            self._pending = request
+            self.requests += 1
+            self._condition.notify()
+
+        return request.number
+
+    def cancel(self):
+        """Drops every request made so far, none of them is applied."""
+
+        # A waiting request still runs to bring the mirror up to date, its
+        # search stops at the first cell
+        self._number += 1
+
+        with self._condition:
+            for request in (self._pending, self._running):
+                if request is not None and not request.cancelled:
+                    request.cancelled = True
+                    self.cancelled += 1
+
+    def busy(self):
+        """Returns if a request is waiting or being solved."""
+
+        with self._condition:
+            return self._pending is not None or self._running is not None
+
+    def poll(self):
+        """
+        Applies the result of the latest request to the Graph if it finished
+        since the last call and returns it, otherwise returns None.
+        """
+
+        with self._condition:
+            result = self._result
+            self._result = None
+
+        if result is None:
+            return None
+
+        request = result.request
+        graph = self.graph
+
+        if (request.number != self._number or request.version != graph.version
+                or request.start != graph.start or request.end != graph.end):
+            return None
+
+        graph.clear_path()
+
+        cells = graph._cells
+        touched = graph._touched
+
+        for index, code in zip(result.touched, result.codes):
+            current = cells[index]
+
+            if current == EMPTY or current == VISITED or current == PATH:
+                cells[index] = code
+                touched.append(index)
+
+        return result
+
+    def _run(self):
+        """Worker thread, solves the requests as they come."""
+
+        condition = self._condition
+
+        while True:
+            with condition:
+                while self._pending is None and not self._closed:
+                    condition.wait()
+
+                if self._closed:
+                    return
+
+                request = self._pending
+                self._pending = None
+                self._running = request
+
+            self._sync(request)
+
+            try:
+                result = self._solve(request)
+            except _Cancelled:
+                result = None
+
+            with condition:
+                self._running = None
+
+                if result is not None and self._pending is None:
+                    self._result = result
+
+    def _sync(self, request):
+        """Brings the mirror up to date with the state of the request."""
+
+        mirror = self._mirror
+
+        if request.start != mirror.start or request.end != mirror.end:
+            # The end moves first when the start takes its place, and a swap
+            # leaves one of them erased, so both are set again after
+            if request.start == mirror.end:
+                mirror.update_end(request.end)
+                mirror.update_start(request.start)
+            else:
+                mirror.update_start(request.start)
+                mirror.update_end(request.end)
+
+            mirror._set(mirror._index(mirror.start), START)
+            mirror._set(mirror._index(mirror.end), END)
+
+        if request.snapshot is not None:
+            walls, costs = request.snapshot
+            mirror.load_walls(walls)
+            mirror.load_costs(costs)
+
+        cols = mirror.collumns
+
+        for index, (is_wall, cost) in request.edits.items():
+            coordinate = divmod(index, cols)
+
+            if is_wall:
+                mirror.make_wall(coordinate)
+            elif mirror._cells[index] == WALL:
+                mirror.make_empty(coordinate)
+
+            mirror.set_cost(coordinate, cost)
+
+    def _solve(self, request):
+        """Runs the search of request on the mirror."""
+
+        mirror = self._mirror
+
+        def draw():
+            if request.cancelled:
+                raise _Cancelled
+
+        def solve(graph, start_node, end_node):
+            return request.solver(graph, start_node, end_node, draw)
+
+        # The solvers only consult a connectivity index that is built. The
+        # mirror answers search after search, off the UI thread, so it keeps
+        # one up to date
+        mirror.get_components().refresh()
+
+        begin = time.perf_counter()
+        nodes = self._path_cache.search(mirror, request.algorithm, solve)
+        seconds = time.perf_counter() - begin
+
+        # The dirty list in order with the final code of every cell, which
+        # is all a Playback needs. Cells whose mark was removed are skipped
+        cells = mirror._cells
+        touched = [index for index in mirror._touched
+                   if cells[index] == VISITED or cells[index] == PATH]
+        codes = bytes(cells[index] for index in touched)
+
+        return SearchResult(request, nodes, touched, codes, seconds,
+                            self._path_cache.last_hit)
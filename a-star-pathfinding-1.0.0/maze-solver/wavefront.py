@@ -0,0 +1,150 @@
+"""
+Breadth first distance fields computed with NumPy.
+
+On a grid where every step costs 1, Dijkstra is a breadth first search. Here
+the search advances one whole frontier at a time: the frontier is an array of
+flat cell indices, its four shifted copies are filtered against the wall mask
+and the cells already reached, and what is left becomes the next frontier.
+Every step is a handful of array operations, there is no per-cell Python.
+
+A field computed from the end answers the path from every start.
+"""
+import numpy as np
+from node import Node
+from node_type import NodeType, EMPTY, VISITED
+
+FAILURE = []
+
+UNREACHED = -1
+
+
+def distance_field(graph, sources=None, until=None, on_wave=None):
+    """
+    Returns an int32 array of shape (rows, collumns) holding the number of
+    steps from every cell to the nearest of sources, a list of (row, col)
+    that defaults to the end of graph. Walls and unreachable cells hold
+    UNREACHED.
+
+    With until, a (row, col), the search stops after the wave that reaches
+    it. on_wave(frontier) is called with the flat indices of every new wave.
+    """
+
+    rows, cols = graph.rows, graph.collumns
+    size = rows * cols
+
+    if sources is None:
+        sources = [graph.end]
+
+    passable = np.frombuffer(graph.get_walls(), dtype=np.uint8) == 0
+    dist = np.full(size, UNREACHED, dtype=np.int32)
+
+    frontier = np.array([row * cols + col for row, col in sources],
+                        dtype=np.intp)
+    frontier = np.unique(frontier[passable[frontier]])
+    dist[frontier] = 0
+
+    target = None if until is None else until[0] * cols + until[1]
+    distance = 0
+
+    while frontier.size:
+        if target is not None and dist[target] != UNREACHED:
+            break
+
+        distance += 1
+        column = frontier % cols
+
+        candidates = np.concatenate((
+            frontier[frontier >= cols] - cols,
+            frontier[frontier < size - cols] + cols,
+            frontier[column != 0] - 1,
+            frontier[column != cols - 1] + 1,
+        ))
+        candidates = candidates[passable[candidates]
+                                & (dist[candidates] == UNREACHED)]
+
+        frontier = np.unique(candidates)
+        dist[frontier] = distance
+
+        if on_wave is not None and frontier.size:
+            on_wave(frontier)
+
+    return dist.reshape(rows, cols)
+
+
+def extract_path(dist, start):
+    """
+    Returns the cells from start down to a source of the distance field dist,
+    both included, as a list of (row, col), or FAILURE when start is not
+    reached.
+    """
+
+    rows, cols = dist.shape
+    row, col = start
+    remaining = int(dist[row, col])
+
+    if remaining == UNREACHED:
+        return FAILURE
+
+    path = [(row, col)]
+
+    while remaining:
+        remaining -= 1
+
+        for next_row, next_col in ((row - 1, col), (row, col - 1),
+                                   (row, col + 1), (row + 1, col)):
+            if (0 <= next_row < rows and 0 <= next_col < cols
+                    and dist[next_row, next_col] == remaining):
+                row, col = next_row, next_col
+                break
+
+        path.append((row, col))
+
+    return path
+
+
+def wavefront(graph, start_node, end_node, draw=None):
+    """
+    Finds a shortest path from start_node to end_node with a wavefront grown
+    from the end and returns the Nodes in between, or FAILURE if there is
+    none. The waves are marked as visited and drawn one at a time.
+    """
+
+    graph.clear_path()
+
+    cells = np.frombuffer(graph._cells, dtype=np.uint8)
+    touched = graph._touched
+
+    def on_wave(frontier):
+        empty = frontier[cells[frontier] == EMPTY]
+        cells[empty] = VISITED
+        touched.extend(empty.tolist())
+
+        if draw is not None:
+            draw()
+
+    start = (start_node.row, start_node.col)
+    cols = graph.collumns
+
+    # Without an index built beforehand the wave simply never reaches the
+    # start and extract_path returns FAILURE
+    if graph.is_separated(start_node.row * cols + start_node.col,
+                          end_node.row * cols + end_node.col):
+        return FAILURE
+
+    dist = distance_field(graph, [(end_node.row, end_node.col)], until=start,
+                          on_wave=on_wave)
+
+    # Drop the start and the end
+    path = extract_path(dist, start)[1:-1]
+
+    nodes = []
+
+    for row, col in path:
+        node = Node(row, col, graph)
+        node.update_type(NodeType.PATH)
+        nodes.append(node)
+
+        if draw is not None:
+            draw()
+
+    return nodes
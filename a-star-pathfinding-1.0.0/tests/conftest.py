@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The solvers are flat modules in maze-solver, imported by their bare names
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "maze-solver"))
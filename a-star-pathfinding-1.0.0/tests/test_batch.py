@@ -0,0 +1,18 @@
+from graph import Graph
+from batch import solve_batch, solve_query
+
+
+def test_workers_solve_on_the_costs():
+    graph = Graph(12, 12)
+
+    # Mud across the straight route, the cheapest path goes around it
+    for row in range(1, 12):
+        graph.set_cost((row, 5), 50)
+
+    queries = [((11, 0), (11, 11)), ((0, 0), (11, 11)), ((6, 2), (6, 9))]
+    expected = [list(solve_query(graph, query)) for query in queries]
+
+    answers = [list(answer)
+               for answer in solve_batch(graph, queries, processes=2)]
+
+    assert answers == expected
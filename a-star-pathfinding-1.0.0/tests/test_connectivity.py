@@ -0,0 +1,55 @@
+import random
+from collections import deque
+import pytest
+from graph import Graph
+from node_type import WALL
+
+
+def bfs_components(graph):
+    """Returns the component of every cell found by a plain BFS, -1 for walls."""
+
+    cells = graph._cells
+    masks, steps = graph.get_neighbor_index()
+    components = [-1] * len(cells)
+
+    for seed in range(len(cells)):
+        if cells[seed] == WALL or components[seed] != -1:
+            continue
+
+        components[seed] = seed
+        queue = deque([seed])
+
+        while queue:
+            current = queue.popleft()
+
+            for step in steps[masks[current]]:
+                neighbor = current + step
+
+                if components[neighbor] == -1:
+                    components[neighbor] = seed
+                    queue.append(neighbor)
+
+    return components
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_labels_match_a_fresh_labelling(seed):
+    rng = random.Random(seed)
+    graph = Graph(20, 20)
+    components = graph.get_components()
+    components.refresh()
+
+    for _ in range(300):
+        # A few edits queued together, then applied by the next query
+        for _ in range(rng.randint(1, 4)):
+            graph.toggle_wall((rng.randrange(20), rng.randrange(20)))
+
+        assert components.is_ready()
+        components.refresh()
+
+        # Both labellings must group the cells the same way
+        expected = bfs_components(graph)
+        pairs = {(components.label(index), component)
+                 for index, component in enumerate(expected)}
+        assert len({label for label, _ in pairs}) == len(pairs)
+        assert len({component for _, component in pairs}) == len(pairs)
@@ -0,0 +1,48 @@
+import random
+import pytest
+from graph import Graph
+from a_star import a_star
+from d_star import d_star
+
+
+def random_edit(rng, graph):
+    """Toggles a wall, or moves the start or the end to an open cell."""
+
+    cell = (rng.randrange(graph.rows), rng.randrange(graph.collumns))
+    roll = rng.random()
+
+    if graph.is_wall(cell) or graph.is_start(cell) or graph.is_end(cell):
+        graph.toggle_wall(cell)
+    elif roll < 0.1:
+        graph.update_start(cell)
+    elif roll < 0.2:
+        graph.update_end(cell)
+    else:
+        graph.toggle_wall(cell)
+
+
+def assert_is_path(graph, nodes):
+    """Asserts nodes lead from the start to the end over open cells."""
+
+    cells = [graph.start] + [(node.row, node.col) for node in nodes]
+
+    for (a_row, a_col), (b_row, b_col) in zip(cells, cells[1:] + [graph.end]):
+        assert abs(a_row - b_row) + abs(a_col - b_col) == 1
+        assert not graph.is_wall((b_row, b_col))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_repaired_tree_matches_a_fresh_search(seed):
+    rng = random.Random(seed)
+    graph = Graph(12, 12)
+
+    for _ in range(400):
+        random_edit(rng, graph)
+
+        start, end = graph.get_start_node(), graph.get_end_node()
+        nodes = d_star(graph, start, end)
+        expected = a_star(graph, start, end)
+
+        assert len(nodes) == len(expected)
+        if nodes:
+            assert_is_path(graph, nodes)
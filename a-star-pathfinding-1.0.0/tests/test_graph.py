@@ -0,0 +1,20 @@
+import random
+from graph import Graph, DEFAULT_COST
+
+
+def test_min_and_max_cost_follow_every_edit():
+    rng = random.Random(13)
+    graph = Graph(8, 8)
+
+    for step in range(500):
+        if step % 100 == 99:
+            graph.load_costs(bytes(rng.randint(1, 255) for _ in range(64)))
+        elif step % 150 == 149:
+            graph.clear()
+        else:
+            cell = (rng.randrange(8), rng.randrange(8))
+            graph.set_cost(cell, rng.choice((DEFAULT_COST, 2, 5, 255)))
+
+        costs = graph.get_costs()
+        assert graph.get_min_cost() == min(costs)
+        assert graph.get_max_cost() == max(costs)
@@ -0,0 +1,31 @@
+import pytest
+from graph import Graph
+from a_star import a_star
+from hpa_star import hpa_star
+
+
+def steps(graph, nodes):
+    """Returns the consecutive cells of the full path from start to end."""
+
+    cells = [graph.start] + [(node.row, node.col) for node in nodes]
+    return list(zip(cells, cells[1:] + [graph.end]))
+
+
+@pytest.mark.parametrize("rows, collumns, end, cluster_size", [
+    (30, 8, (29, 0), 10),
+    (6, 4, (5, 3), 4),
+])
+def test_narrow_grid_path_steps_between_adjacent_cells(rows, collumns, end,
+                                                      cluster_size):
+    # A single column of clusters, stacked clusters are numbered a, a + 1
+    graph = Graph(rows, collumns)
+    graph.update_end(end)
+
+    nodes = hpa_star(graph, graph.get_start_node(), graph.get_end_node(),
+                     cluster_size=cluster_size)
+
+    assert a_star(graph, graph.get_start_node(), graph.get_end_node())
+    assert nodes
+
+    for (a_row, a_col), (b_row, b_col) in steps(graph, nodes):
+        assert abs(a_row - b_row) + abs(a_col - b_col) == 1
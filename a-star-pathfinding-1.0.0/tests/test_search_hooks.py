@@ -0,0 +1,30 @@
+import pytest
+from graph import Graph
+from maze import generate_maze
+from a_star import a_star
+from dijkstra import dijkstra
+from d_star import d_star
+from d_star_lite import d_star_lite
+from search_hooks import SearchHooks
+
+
+@pytest.mark.parametrize("solver", [a_star, dijkstra, d_star, d_star_lite])
+def test_relax_reports_score_changes_only(solver):
+    graph = Graph(30, 30)
+    generate_maze(graph, seed=5)
+
+    # The second search runs after wall edits, which d_star_lite repairs
+    for edits in ((), ((1, 1), (3, 1))):
+        for coordinate in edits:
+            graph.toggle_wall(coordinate)
+
+        scores = {}
+
+        def on_relax(row, col, g):
+            assert scores.get((row, col)) != g
+            scores[row, col] = g
+
+        solver(graph, graph.get_start_node(), graph.get_end_node(),
+               hooks=SearchHooks(on_relax=on_relax))
+
+        assert scores
@@ -0,0 +1,37 @@
+import pytest
+from graph import Graph
+from maze import generate_maze
+from a_star import a_star
+from dijkstra import dijkstra
+from d_star import d_star
+from d_star_lite import d_star_lite
+from search_hooks import SearchHooks
+from search_stats import SearchStats
+
+
+@pytest.mark.parametrize("solver", [a_star, dijkstra, d_star, d_star_lite])
+def test_stats_count_the_events_reported_to_hooks(solver):
+    graph = Graph(30, 30)
+    generate_maze(graph, seed=3)
+
+    # The second search reuses the work of the first one in d_star and
+    # d_star_lite, only its own events count
+    for _ in range(2):
+        events = {"expand": 0, "push": 0}
+
+        def count(kind):
+            def callback(*args):
+                events[kind] += 1
+            return callback
+
+        hooks = SearchHooks(on_expand=count("expand"), on_push=count("push"))
+        stats = SearchStats()
+        nodes = solver(graph, graph.get_start_node(), graph.get_end_node(),
+                       stats=stats, hooks=hooks)
+
+        assert nodes
+        assert stats.path_length == len(nodes)
+        assert stats.expanded == events["expand"]
+        assert stats.pushes == events["push"]
+
+        graph.update_start((2, 0) if graph.start == (0, 0) else (0, 0))
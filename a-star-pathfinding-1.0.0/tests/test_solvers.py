@@ -0,0 +1,37 @@
+import pytest
+from graph import Graph
+from a_star import a_star
+from dijkstra import dijkstra
+from d_star import d_star
+from d_star_lite import d_star_lite
+from jps import jps
+from bidirectional import bidirectional_a_star, bidirectional_dijkstra
+
+
+def jps_plus(graph, start_node, end_node):
+    return jps(graph, start_node, end_node, plus=True)
+
+
+SOLVERS = [a_star, dijkstra, d_star, d_star_lite, jps, jps_plus,
+           bidirectional_a_star, bidirectional_dijkstra]
+
+
+@pytest.mark.parametrize("solver", SOLVERS)
+def test_start_on_end_has_no_cells_in_between(solver):
+    graph = Graph(5, 5, start=(2, 2), end=(2, 2))
+
+    assert solver(graph, graph.get_start_node(), graph.get_end_node()) == []
+
+
+@pytest.mark.parametrize("solver", SOLVERS)
+def test_weighted_path_is_the_cheapest(solver):
+    # The straight line along the top row is shorter but goes through mud
+    graph = Graph(5, 5, start=(0, 0), end=(0, 4))
+    for col in range(1, 4):
+        graph.set_cost((0, col), 5)
+
+    costs = graph.get_costs()
+    nodes = solver(graph, graph.get_start_node(), graph.get_end_node())
+
+    assert len(nodes) == 5
+    assert sum(costs[node.row * 5 + node.col] for node in nodes) == 5